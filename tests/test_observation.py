@@ -0,0 +1,67 @@
+from typing import *
+from numpy.typing import NDArray
+
+import numpy as np
+import pytest
+
+from xai.games.asteroids import AsteroidsObservation
+
+# The spaceship angle of each of the 16 rotation steps, as read from RAM by Asteroids.get_angle.
+_ANGLES = (
+    0.0, 
+    0.23186466084938862, 
+    0.5880026035475675, 
+    0.9037239459029813, 
+    1.5707963267948966, 
+    2.256525837701183, 
+    2.6909313275091598, 
+    2.936197264400026, 
+    3.141592653589793, 
+    3.2834897081939567, 
+    3.597664649939404, 
+    4.023464592169828, 
+    4.71238898038469, 
+    5.365235611485464, 
+    5.81953769817878, 
+    6.120457932539206
+)
+
+def _frame(rng: np.random.Generator, player: Tuple[int,int]|None) -> Tuple[NDArray[np.uint8],NDArray[np.uint8]]:
+    # Asteroids as colored blobs, also over the score rows, and the player as a blob that may wrap around the edges.
+    spaceship = np.zeros((210,160,3), dtype=np.uint8)
+    asteroids = np.zeros((210,160,3), dtype=np.uint8)
+
+    for _ in range(rng.integers(5, 20)):
+        y, x = rng.integers(0, 210), rng.integers(0, 160)
+        h, w = rng.integers(2, 10), rng.integers(2, 10)
+        asteroids[y:y + h,x:x + w] = rng.integers(1, 256, size=3)
+
+    for _ in range(rng.integers(0, 4)):
+        spaceship[rng.integers(18, 195),rng.integers(0, 160)] = (117,181,239)
+
+    if player is not None:
+        y, x = player
+        rows, columns = np.meshgrid(np.arange(y, y + 10), np.arange(x, x + 5), indexing="ij")
+        spaceship[18 + rows%177,columns%160] = (240,128,128)
+
+    return spaceship, asteroids
+
+@pytest.mark.parametrize("step", range(len(_ANGLES)))
+def test_ego_centric_matches_translated_rotated(step: int) -> None:
+    rng = np.random.default_rng(step)
+    angle = _ANGLES[step]
+    players = [None, (0,0), (172,157)] + [(int(rng.integers(0, 177)),int(rng.integers(0, 160))) for _ in range(10)]
+
+    for player in players:
+        spaceship, asteroids = _frame(rng, player)
+        observation = AsteroidsObservation(spaceship=spaceship, asteroids=asteroids, spaceship_angle=angle)
+        expected = observation.translated().rotated()
+        actual = observation.ego_centric()
+
+        assert np.array_equal(actual.spaceship, expected.spaceship), player
+        assert np.array_equal(actual.asteroids, expected.asteroids), player
+
+def test_ego_centric_without_angle_only_translates() -> None:
+    spaceship, asteroids = _frame(np.random.default_rng(0), (50,60))
+    observation = AsteroidsObservation(spaceship=spaceship, asteroids=asteroids)
+    assert np.array_equal(observation.ego_centric().numpy(), observation.translated().numpy())
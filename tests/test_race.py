@@ -0,0 +1,54 @@
+from typing import *
+
+import numpy as np
+
+from xai.agents import Race, Fitness, FitnessSchema, AgentResult
+
+_SCHEMA = FitnessSchema.of(rewards=("game_score",), penalties=("salience","game_step"))
+
+def _fitness(score: float, steps: int) -> Fitness:
+    # Like the bots, whose penalties accumulate with every step played.
+    return Fitness(schema=_SCHEMA, values=np.array([score, 10.0*steps, float(steps)]))
+
+def _finished(scores: Sequence[float], interval: int) -> AgentResult:
+    # An episode that scored scores[c] by checkpoint c, and ended after the last of them.
+    steps = len(scores)*interval - 1
+    return cast(AgentResult, {
+        "fitness": _fitness(scores[-1], steps),
+        "game_reward": scores[-1],
+        "steps_played": steps,
+        "aborted": False,
+        "race_progress": [_fitness(score, (c + 1)*interval).numpy().tolist() for c,score in enumerate(scores[:-1])]
+    })
+
+def _race(contenders: int = 2) -> Race:
+    # Early deaths finish, and move the bounds, before any long episode does.
+    race = Race(contenders=contenders, max_time_steps=1_000, interval=100)
+    for scores in ((5.0,), (6.0,), (7.0,), (1.0, 1.0)):
+        race.record(_finished(scores, race.interval))
+    return race
+
+def test_long_high_scoring_episode_is_not_aborted() -> None:
+    race = _race()
+    progress: List[List[float]] = []
+    for step in range(1, 800):
+        assert not race.overtaken(step, _fitness(20.0, step), progress)
+
+def test_hopeless_episode_is_aborted() -> None:
+    race = _race()
+    progress: List[List[float]] = []
+    assert not race.overtaken(99, _fitness(1.0, 99), progress)
+    assert race.overtaken(100, _fitness(1.0, 100), progress)
+
+def test_bounds_ignore_penalties() -> None:
+    race = _race()
+    assert np.allclose(race.bounds(), 5/6)
+
+def test_other_schema_is_never_aborted() -> None:
+    race = _race()
+    other = Fitness(schema=FitnessSchema.of(rewards=("game_score",), penalties=()), values=np.array([0.0]))
+    assert not race.overtaken(100, other, [])
+
+def test_no_bounds_before_enough_contenders() -> None:
+    race = _race(contenders=5)
+    assert not race.overtaken(100, _fitness(0.0, 100), [])
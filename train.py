@@ -1,17 +1,21 @@
 
 import xai
 
-model = xai.V7Bot("cpu")
+# A preempted job continues from the latest population snapshot.
+if xai.Population.latest_snapshot("v7bot"):
+    xai.Population.resume("v7bot")
+else:
+    model = xai.V7Bot("cpu")
 
-pop = model.populate(number_of_genomes=600)
+    pop = model.populate(number_of_genomes=600)
 
-pop.evolve(
-    number_of_generations=600,
-    survivor_cnt=1,
-    elite_parents=0,
-    roulette_parents=60,
-    dirname="v7bot",
-    number_of_process=96
-)
+    pop.evolve(
+        number_of_generations=600,
+        survivor_cnt=1,
+        elite_parents=0,
+        roulette_parents=60,
+        dirname="v7bot",
+        number_of_process=96
+    )
 
 
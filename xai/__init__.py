@@ -9,8 +9,9 @@ from .models.asteroids import SalientBot, SpinnerBot, V3Bot, V4Bot, V5Bot, V6Bot
 
 G = TypeVar("G", bound=Genome)
 
-def load_model(path: str, type: Type[G]) -> G:
-    agent = type.load(path)
+def load_model(path: str, type: Type[G], index: int = -1) -> G:
+    # Genome checkpoints hold one genome per row, of which the last is loaded by default.
+    agent = Checkpoint[G](path).genome(index) if Checkpoint.is_checkpoint(path) else type.load(path)
     if isinstance(agent, type):
         return agent
     else:
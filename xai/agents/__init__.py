@@ -1,15 +1,28 @@
 from .policy import Policy
-from .fitness import Fitness
+from .fitness import Fitness, FitnessSchema
+from .memory import Memory
+from .salience_sampler import SalienceSampler
+from .race import Race
 from .agent import Agent
 from .agent_result import AgentResult
-from .memory import Memory
 from .ga.chromosome import Chromosome
+from .ga.breeder import Breeder
 from .ga.genome import Genome
+from .ga.checkpoint import Checkpoint
 from .ga.specimen import Specimen
+from .ga.lineage import Lineage
+from .ga.genome_store import GenomeStore
+from .ga.genome_batch import GenomeBatch
+from .ga.evaluation_cache import EvaluationCache
 from .ga.population import Population
+from .ga.distributed import Coordinator
 from .rl.record import Record
 from .rl.zipped_record import ZippedRecord
 from .rl.replay import ReplayBuffer
+from .rl.replay_batch import ReplayBatch
+from .rl.sum_tree import SumTree, MinTree
+from .rl.ring_replay import RingReplayBuffer
+from .rl.mapped_replay import MappedReplayBuffer
 from .rl.reinforcement import RlAgent
 from .rl.dqn.agent import DqnAgent
 from .rl.ppo.agent import PPOAgent
\ No newline at end of file
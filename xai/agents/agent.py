@@ -11,11 +11,11 @@ import numpy as np
 import cv2
 
 from ..util import ByteSize, Device
-from ..agents import Fitness
+from ..agents import Fitness, Memory
 
 if TYPE_CHECKING:
     from numpy import generic
-    from ..agents import Policy, AgentResult
+    from ..agents import Policy, AgentResult, Race
     from ..games import Environment, Observation, Action, Reward, GameStats
 
 T = TypeVar("T", bound="generic")
@@ -80,6 +80,11 @@ class Agent(ABC, Generic[E,O,P,A,R]):
             actions=self._actions
         )
 
+    def reset(self) -> None:
+        for layer in self._layers:
+            if isinstance(layer, Memory):
+                layer.reset()
+
     def save(self, path: str) -> None:        
         if "." not in path:
             path = f"{path}.{self.__class__.__name__.lower()}"
@@ -103,28 +108,52 @@ class Agent(ABC, Generic[E,O,P,A,R]):
              show:              bool = False,
              silent:            bool = True,
              window_scale:      float = 1.0,
+             decision_interval: int = 1,
+             race:              "Race|None" = None,
              on_time_step:      Callable[["GameStats[O,P,A,R]"],None] = lambda *_: None) -> "AgentResult":
 
         def _play(env:            E, 
                   update_window:  Callable[[O],None] = lambda *_: None) -> "AgentResult":
 
+            assert decision_interval > 0, "Decision interval must be positive."
+
             env.reset()
+            self.reset()
             lives = env.lives()
 
             fitness = Fitness()
             game_reward: int|float = 0
+            progress: List[List[float]] = []
+            aborted = False
+
+            def result() -> "AgentResult":
+                agent_result: "AgentResult" = {
+                    "steps_played": step,
+                    "game_reward": game_reward,
+                    "fitness": fitness,
+                    "aborted": aborted
+                }
+                if race is not None:
+                    agent_result["race_progress"] = progress
+                return agent_result
             
             step = 0
             for _ in range(rounds):
                 with tqdm(total=max_time_steps, desc="Step", disable=silent) as time_step_bar:
-                    while env.running() and step < max_time_steps:
+                    while env.running() and step < max_time_steps and not aborted:
                         if not respawn and env.lives() < lives:
                             break
 
                         observation: O = env.render()
                         policy: P = self.forward(observation)
                         action: A = policy.action()
-                        reward: R = env.step(action, stochastic=stochastic) 
+                        # The action is repeated for the skipped frames, whose rewards and observations
+                        # are all part of the returned reward, so fitness still covers every frame.
+                        reward: R = env.step(
+                            action, 
+                            stochastic=stochastic, 
+                            steps=min(decision_interval, max_time_steps - step)
+                        ) 
 
                         game_reward += reward.native_game_reward()
 
@@ -148,21 +177,16 @@ class Agent(ABC, Generic[E,O,P,A,R]):
                                 "step": step
                             })
                         except StopIteration:
-                            return {
-                                "steps_played": step,
-                                "game_reward": game_reward,
-                                "fitness": fitness
-                                }
+                            return result()
+
+                        step += len(reward.values)
 
-                        step += 1
+                        time_step_bar.update(len(reward.values))
 
-                        time_step_bar.update()
+                        if race is not None:
+                            aborted = race.overtaken(step, fitness, progress)
 
-            return {
-                "steps_played": step,
-                "game_reward": game_reward,
-                "fitness": fitness
-            }
+            return result()
         
         if env is None:
             env = self.create_environment()
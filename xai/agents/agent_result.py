@@ -7,3 +7,6 @@ class AgentResult(TypedDict):
     steps_played: int
     game_reward: int|float
     fitness: "Fitness"
+    aborted: bool
+    race_progress: NotRequired[List[List[float]]]
+    episodes: NotRequired[int]
@@ -1,9 +1,11 @@
 from typing import *
 from torch import FloatTensor
 
-from ....agents import Genome, Chromosome, Memory
+import dataclasses
+
+from ....agents import Genome, Chromosome, Memory, SalienceSampler
 from ....agents.asteroids import AsteroidsPolicy
-from ....games.asteroids import AsteroidsAction, Asteroids
+from ....games.asteroids import AsteroidsAction, Asteroids, AsteroidsPreprocessing
 from ....util import Device
 
 if TYPE_CHECKING:
@@ -15,11 +17,37 @@ class AsteroidsGenome(Genome[Asteroids,
                              AsteroidsAction,
                              "AsteroidsReward"]):
 
+    def __init__(self, 
+                 device:            Device, 
+                 mutation_rate:     float = 0.05,
+                 saliency_interval: int = 1,
+                 sparse_input:      bool = False,
+                 preprocessing:     AsteroidsPreprocessing|None = None,
+                 sticky_actions:    float = 0.0) -> None:
+        self.salience_sampler = SalienceSampler(interval=saliency_interval)
+        self.sparse_input = sparse_input
+        self.preprocessing = preprocessing if preprocessing else AsteroidsPreprocessing()
+        self.sticky_actions = sticky_actions
+        super().__init__(device=device, mutation_rate=mutation_rate)
+
+    def config(self) -> Dict[str,Any]:
+        return dict(
+            super().config(),
+            saliency_interval=self.salience_sampler.interval,
+            sparse_input=self.sparse_input,
+            preprocessing=dataclasses.asdict(self.preprocessing),
+            sticky_actions=self.sticky_actions
+        )
+
+    @classmethod
+    def from_config(cls, device: Device, config: Dict[str,Any]) -> Self:
+        return cls(device, **dict(config, preprocessing=AsteroidsPreprocessing(**config["preprocessing"])))
+
     def create_environment(self) -> Asteroids:
-        return Asteroids()
+        return Asteroids(sticky_actions=self.sticky_actions)
     
     def in_transform(self, observation: "AsteroidsObservation") -> FloatTensor:
-        return observation.translated().tensor(
+        return observation.translated().preprocessed(self.preprocessing).tensor(
             device=self.device,
             dtype="float32",
             flatten=True,
@@ -37,6 +65,19 @@ class AsteroidsGenome(Genome[Asteroids,
             strategy=lambda policy: policy.greedy_max()
         )
     
+    def salience_penalty(self, 
+                         game_step: int, 
+                         policy:    AsteroidsPolicy, 
+                         reward:    "AsteroidsReward") -> float:
+        return self.salience_sampler.penalty(
+            game_step=game_step, 
+            compute=lambda: reward.salience_penalty(policy=policy)
+        )
+    
+    def reset(self) -> None:
+        super().reset()
+        self.salience_sampler.reset()
+    
     def create_actions(self) -> Iterable[AsteroidsAction]:
         return (
             AsteroidsAction.NOOP,
@@ -46,10 +87,13 @@ class AsteroidsGenome(Genome[Asteroids,
             AsteroidsAction.FIRE
         )
     
+    def input_size(self) -> int:
+        return self.preprocessing.size()
+    
     def create_layers(self, device: Device) -> Iterable[Callable[[FloatTensor], FloatTensor]]:
-        input_size = 210*160*3
+        input_size = self.input_size()
         return (
-            Chromosome(input_size,64, mutation_rate=self.mutation_rate, device=device, dtype="float32"),
+            Chromosome(input_size,64, mutation_rate=self.mutation_rate, device=device, dtype="float32", sparse_input=self.sparse_input),
             Memory(),
             Chromosome(2*64,64, mutation_rate=self.mutation_rate, device=device, dtype="float32"),
             Chromosome(64,32, mutation_rate=self.mutation_rate, device=device, dtype="float32"),
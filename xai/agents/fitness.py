@@ -1,157 +1,244 @@
 from typing import *
 from typing import Dict
+from dataclasses import dataclass, field
+from numpy.typing import NDArray
+
+import numpy as np
+import functools
+
+@dataclass(frozen=True)
+class FitnessSchema:
+    rewards: Tuple[str,...]
+    penalties: Tuple[str,...]
+    _indices: Dict[str,Tuple[bool,int]] = field(init=False, repr=False, compare=False, hash=False)
+
+    def __post_init__(self) -> None:
+        indices = {category: (True, i) for i,category in enumerate(self.rewards)}
+        indices.update((category, (False, len(self.rewards) + i)) for i,category in enumerate(self.penalties))
+        object.__setattr__(self, "_indices", indices)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def of(rewards: Tuple[str,...], penalties: Tuple[str,...]) -> "FitnessSchema":
+        # Interned, so that fitnesses built from the same categories share one schema.
+        return FitnessSchema(rewards=rewards, penalties=penalties)
+
+    def size(self) -> int:
+        return len(self.rewards) + len(self.penalties)
+
+    def reward_index(self, category: str) -> int|None:
+        is_reward, index = self._indices.get(category, (False, -1))
+        return index if is_reward else None
+
+    def penalty_index(self, category: str) -> int|None:
+        is_reward, index = self._indices.get(category, (True, -1))
+        return None if is_reward else index
+
+    def union(self, other: "FitnessSchema") -> "FitnessSchema":
+        return FitnessSchema.of(
+            rewards=self.rewards + tuple(category for category in other.rewards if category not in self.rewards),
+            penalties=self.penalties + tuple(category for category in other.penalties if category not in self.penalties)
+        )
+
+    def columns(self, other: "FitnessSchema") -> NDArray[np.int64]:
+        # Column of every category of other in this schema, which must contain them all.
+        return np.array(
+            [self.reward_index(category) for category in other.rewards] +\
+            [self.penalty_index(category) for category in other.penalties],
+            dtype=np.int64
+        )
 
 class Fitness:
 
-    def __init__(self, 
+    def __init__(self,
                  rewards:     Dict[str,float]|None = None,
-                 penalties:   Dict[str,float]|None = None) -> None:
-        
-        if rewards is None:
-            self._named_rewards = {}
-        else:
-            self._named_rewards = rewards.copy()
+                 penalties:   Dict[str,float]|None = None,
+                 schema:      FitnessSchema|None = None,
+                 values:      NDArray[np.float64]|None = None) -> None:
 
-        if penalties is None:
-            self._named_penalties = {}
-        else:
-            self._named_penalties = penalties.copy()
+        rewards = rewards if rewards else {}
+        penalties = penalties if penalties else {}
+
+        if schema is None:
+            schema = FitnessSchema.of(tuple(rewards), tuple(penalties))
+
+        if values is None:
+            values = np.array(
+                [rewards.get(category, 0) for category in schema.rewards] +\
+                [penalties.get(category, 0) for category in schema.penalties],
+                dtype=np.float64
+            )
+
+        self.schema = schema
+        self._values = values
+
+    def numpy(self) -> NDArray[np.float64]:
+        return self._values
 
     def normalized(self, min_fitness: "Fitness", max_fitness: "Fitness") -> "NormalizedFitness":
-        normalized_fitness = NormalizedFitness(non_normalized=self)
-        for category,reward in self.rewards():
-            max, min = max_fitness.get_reward(category), min_fitness.get_reward(category)
-            if max - min == 0:
-                normalized_fitness.set_reward(category, 1.0)
-            else:
-                normalized_fitness.set_reward(category, (reward - min)/(max - min))
-
-        for category,penalty in self.penalties():
-            max, min = max_fitness.get_penalty(category), min_fitness.get_penalty(category)
-            if max - min == 0:
-                normalized_fitness.set_penalty(category, 1.0)
-            else:
-                normalized_fitness.set_penalty(category, (penalty - min)/(max - min))
-
-        return normalized_fitness
+        min_values = np.array([min_fitness.get_reward(c) for c in self.schema.rewards] + [min_fitness.get_penalty(c) for c in self.schema.penalties])
+        max_values = np.array([max_fitness.get_reward(c) for c in self.schema.rewards] + [max_fitness.get_penalty(c) for c in self.schema.penalties])
+        return NormalizedFitness(
+            non_normalized=self,
+            schema=self.schema,
+            values=normalize_values(self._values, min_values, max_values)
+        )
 
     def __add__(self, other: "Fitness") -> "Fitness":
         result = self.copy()
-        for category,reward in other.rewards():
-            result._named_rewards[category] = result._named_rewards.get(category, 0) + reward
-
-        for category,penalty in other.penalties():
-            result._named_penalties[category] = result._named_penalties.get(category, 0) + penalty
-
+        result += other
         return result
 
     def __iadd__(self, other: "Fitness") -> "Fitness":
-        for category,reward in other.rewards():
-            self._named_rewards[category] = self._named_rewards.get(category, 0) + reward
-
-        for category,penalty in other.penalties():
-            self._named_penalties[category] = self._named_penalties.get(category, 0) + penalty
+        if self.schema is other.schema or self.schema == other.schema:
+            np.add(self._values, other._values, out=self._values)
+        elif self.schema.size() == 0:
+            self.schema = other.schema
+            self._values = other._values.copy()
+        else:
+            schema = self.schema.union(other.schema)
+            values = np.zeros(schema.size())
+            values[schema.columns(self.schema)] = self._values
+            values[schema.columns(other.schema)] += other._values
+            self.schema = schema
+            self._values = values
 
         return self
 
     def rewards(self) -> Iterator[Tuple[str,float]]:
-        for category,reward in self._named_rewards.items():
-            yield category,reward
+        for category,reward in zip(self.schema.rewards, self._values):
+            yield category,float(reward)
 
     def penalties(self) -> Iterator[Tuple[str,float]]:
-        for category,penalty in self._named_penalties.items():
-            yield category,penalty
-    
+        for category,penalty in zip(self.schema.penalties, self._values[len(self.schema.rewards):]):
+            yield category,float(penalty)
+
     def get_reward(self, category: str) -> float:
-        return self._named_rewards.get(category, 0)
-    
+        index = self.schema.reward_index(category)
+        return 0 if index is None else float(self._values[index])
+
     def set_reward(self, category: str, reward: float) -> None:
-        self._named_rewards[category] = reward
-    
+        if self.schema.reward_index(category) is None:
+            self += Fitness(schema=FitnessSchema.of((category,), ()), values=np.zeros(1))
+        self._values[cast(int, self.schema.reward_index(category))] = reward
+
     def get_penalty(self, category: str) -> float:
-        return self._named_penalties.get(category, 0)
-    
+        index = self.schema.penalty_index(category)
+        return 0 if index is None else float(self._values[index])
+
     def set_penalty(self, category: str, penalty: float) -> None:
-        self._named_penalties[category] = penalty
+        if self.schema.penalty_index(category) is None:
+            self += Fitness(schema=FitnessSchema.of((), (category,)), values=np.zeros(1))
+        self._values[cast(int, self.schema.penalty_index(category))] = penalty
 
     def __repr__(self) -> str:
         return str(dict(
-            rewards=self._named_rewards,
-            penalties=self._named_penalties
+            rewards=dict(self.rewards()),
+            penalties=dict(self.penalties())
         ))
 
     def copy(self) -> "Fitness":
         return Fitness(
-            rewards=self._named_rewards,
-            penalties=self._named_penalties
+            schema=self.schema,
+            values=self._values.copy()
         )
 
     @staticmethod
     def max_fitness(fitnesses: Iterable["Fitness"]) -> "Fitness":
-        max_fitness = Fitness()
-        for fitness in fitnesses:
-            for category,reward in fitness.rewards():
-                if category in max_fitness._named_rewards:
-                    max_fitness.set_reward(category, max(max_fitness.get_reward(category), reward))
-                else:
-                    max_fitness.set_reward(category, reward)
-
-            for category,penalty in fitness.penalties():
-                if category in max_fitness._named_penalties:
-                    max_fitness.set_penalty(category, max(max_fitness.get_penalty(category), penalty))
-                else:
-                    max_fitness.set_penalty(category, penalty)
-
-        return max_fitness
+        schema, matrix, present = Fitness._stack(fitnesses)
+        return Fitness(schema=schema, values=np.where(present, matrix, -np.inf).max(axis=0, initial=-np.inf))
 
     @staticmethod
     def min_fitness(fitnesses: Iterable["Fitness"]) -> "Fitness":
-        min_fitness = Fitness()
-        for fitness in fitnesses:
-            for category,reward in fitness.rewards():
-                if category in min_fitness._named_rewards:
-                    min_fitness.set_reward(category, min(min_fitness.get_reward(category), reward))
-                else:
-                    min_fitness.set_reward(category, reward)
-
-            for category,penalty in fitness.penalties():
-                if category in min_fitness._named_penalties:
-                    min_fitness.set_penalty(category, min(min_fitness.get_penalty(category), penalty))
-                else:
-                    min_fitness.set_penalty(category, penalty)
-
-        return min_fitness
-    
+        schema, matrix, present = Fitness._stack(fitnesses)
+        return Fitness(schema=schema, values=np.where(present, matrix, np.inf).min(axis=0, initial=np.inf))
+
+    @staticmethod
+    def normalize_all(fitnesses:     Iterable["Fitness"],
+                      disqualified:  Iterable[bool]|None = None) -> Tuple["NormalizedFitness",...]:
+        fitnesses = tuple(fitnesses)
+        schema, matrix, present = Fitness._stack(fitnesses)
+
+        # Disqualified fitnesses, e.g. of aborted episodes, do not affect the others and are ranked 0.
+        excluded = np.zeros(len(fitnesses), dtype=np.bool_) if disqualified is None else np.fromiter(disqualified, dtype=np.bool_, count=len(fitnesses))
+        contributing = present & ~excluded[:,None]
+
+        # Categories are normalized over the fitnesses that contain them, and ranks only include those.
+        normalized = normalize_values(
+            matrix,
+            np.where(contributing, matrix, np.inf).min(axis=0, initial=np.inf),
+            np.where(contributing, matrix, -np.inf).max(axis=0, initial=-np.inf)
+        )
+        factors = np.where(present, normalized, 1.0)
+        factors[:,len(schema.rewards):] = np.where(present[:,len(schema.rewards):], 1 - normalized[:,len(schema.rewards):], 1.0)
+        ranks = np.where(excluded, 0.0, factors.prod(axis=1))
+
+        return tuple(
+            NormalizedFitness(
+                non_normalized=fitness,
+                schema=fitness.schema,
+                values=row if fitness.schema == schema else row[schema.columns(fitness.schema)],
+                rank=float(rank)
+            )
+            for fitness,row,rank in zip(fitnesses, normalized, ranks)
+        )
+
     @staticmethod
-    def normalize_all(fitnesses: Iterable["Fitness"]) -> Tuple["NormalizedFitness",...]:
+    def _stack(fitnesses: Iterable["Fitness"]) -> Tuple[FitnessSchema,NDArray[np.float64],NDArray[np.bool_]]:
+        # The (fitnesses x categories) matrix over the union of the schemas, with a mask of the present categories.
         fitnesses = tuple(fitnesses)
-        min_fitness = Fitness.min_fitness(fitnesses)
-        max_fitness = Fitness.max_fitness(fitnesses)
-        return tuple(fitness.normalized(min_fitness=min_fitness, max_fitness=max_fitness) for fitness in fitnesses)
+        if len(fitnesses) == 0:
+            return FitnessSchema.of((), ()), np.zeros((0,0)), np.zeros((0,0), dtype=np.bool_)
+
+        schema = fitnesses[0].schema
+        if all(fitness.schema is schema or fitness.schema == schema for fitness in fitnesses):
+            matrix = np.stack([fitness._values for fitness in fitnesses])
+            return schema, matrix, np.ones(matrix.shape, dtype=np.bool_)
+
+        for fitness in fitnesses:
+            schema = schema.union(fitness.schema)
+
+        matrix = np.zeros((len(fitnesses), schema.size()))
+        present = np.zeros(matrix.shape, dtype=np.bool_)
+        for row,fitness in enumerate(fitnesses):
+            columns = schema.columns(fitness.schema)
+            matrix[row,columns] = fitness._values
+            present[row,columns] = True
+
+        return schema, matrix, present
 
 
 class NormalizedFitness(Fitness):
 
-    def __init__(self, 
+    def __init__(self,
                  non_normalized: Fitness,
-                 rewards: Dict[str, float] | None = None, 
-                 penalties: Dict[str, float] | None = None) -> None:
-        super().__init__(rewards, penalties)
+                 rewards: Dict[str, float] | None = None,
+                 penalties: Dict[str, float] | None = None,
+                 schema: FitnessSchema | None = None,
+                 values: NDArray[np.float64] | None = None,
+                 rank: float | None = None) -> None:
+        super().__init__(rewards, penalties, schema, values)
         self.non_normalized = non_normalized
+        self._rank = rank
 
-    def rank(self) -> float:
-        reduction = 1.0
-        for _,reward in self.rewards():
-            reduction *= reward
+    def set_reward(self, category: str, reward: float) -> None:
+        super().set_reward(category, reward)
+        self._rank = None
 
-        for _,penalty in self.penalties():
-            reduction *= (1 - penalty)
+    def set_penalty(self, category: str, penalty: float) -> None:
+        super().set_penalty(category, penalty)
+        self._rank = None
+
+    def rank(self) -> float:
+        if self._rank is None:
+            rewards = self._values[:len(self.schema.rewards)]
+            penalties = self._values[len(self.schema.rewards):]
+            self._rank = float(rewards.prod()*(1 - penalties).prod())
+        return self._rank
 
-        return reduction
-    
     def un_normalize(self) -> Fitness:
         return self.non_normalized
-    
+
     def __repr__(self) -> str:
         return str({
             "Rank": self.rank(),
@@ -159,4 +246,14 @@ class NormalizedFitness(Fitness):
             "Normalized rewards": tuple(self.rewards()),
             "Penalties": tuple(self.non_normalized.penalties()),
             "Normalized penalties": tuple(self.penalties()),
-        })
\ No newline at end of file
+        })
+
+
+def normalize_values(values:   NDArray[np.float64],
+                     minimum:  NDArray[np.float64],
+                     maximum:  NDArray[np.float64]) -> NDArray[np.float64]:
+    # Categories without any spread are normalized to 1.0.
+    span = maximum - minimum
+    normalized = np.ones(np.broadcast(values, span).shape)
+    np.divide(values - minimum, span, out=normalized, where=span != 0)
+    return normalized
@@ -0,0 +1,156 @@
+from typing import *
+from numpy.typing import NDArray
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from numpy import generic
+    from ...games import Environment, Observation, Action, Reward
+    from ...agents import Genome, Policy
+
+G = TypeVar("G", bound="""Genome[
+            Environment[Observation[generic],Action,Reward[Observation[generic],Action]],
+            Observation[generic],
+            Policy[Action],
+            Action,
+            Reward[Observation[generic],Action]
+            ]""")
+
+class Breeder(Generic[G]):
+
+    def __init__(self, template: G) -> None:
+        super().__init__()
+
+        # Every gene is a (start, end, row_size) segment of the flat genome, grouped by chromosome.
+        chromosomes: List[Tuple[Tuple[int,int,int],...]] = []
+        offset = 0
+        for chromosome in template:
+            genes: List[Tuple[int,int,int]] = []
+            for gene in chromosome:
+                size = gene.nelement()
+                genes.append((offset, offset + size, size//gene.shape[0]))
+                offset += size
+            chromosomes.append(tuple(genes))
+
+        self._chromosomes = tuple(chromosomes)
+        self._numel = offset
+
+    def numel(self) -> int:
+        return self._numel
+
+    def breed(self,
+              parent1:          NDArray[np.float32],
+              parent2:          NDArray[np.float32],
+              rates1:           NDArray[np.float64]|Sequence[float],
+              rates2:           NDArray[np.float64]|Sequence[float],
+              child1:           NDArray[np.float32],
+              child2:           NDArray[np.float32],
+              mutation_rate:    float|None = None,
+              rng:              np.random.Generator|None = None) -> None:
+
+        assert parent1.size == parent2.size == child1.size == child2.size == self._numel
+
+        def split(buffer: NDArray[np.float32]) -> List[List[NDArray[np.float32]]]:
+            return [[buffer[start:end] for start,end,_ in genes] for genes in self._chromosomes]
+        
+        self._breed(
+            parent1=split(parent1),
+            parent2=split(parent2),
+            rates1=rates1,
+            rates2=rates2,
+            child1=split(child1),
+            child2=split(child2),
+            mutation_rate=mutation_rate,
+            rng=rng
+        )
+
+    def breed_genomes(self,
+                      parent1:          G,
+                      parent2:          G,
+                      mutation_rate:    float|None = None,
+                      rng:              np.random.Generator|None = None) -> Tuple[G,G]:
+        # Each child gets a buffer of its own, since pickling a view pickles its whole base buffer.
+        child1 = np.empty(self._numel, dtype=np.float32)
+        child2 = np.empty(self._numel, dtype=np.float32)
+
+        def genes(genome: G) -> List[List[NDArray[np.float32]]]:
+            return [[gene.detach().numpy().reshape(-1) for gene in chromosome] for chromosome in genome]
+
+        children = parent1.view(child1), parent2.view(child2)
+
+        self._breed(
+            parent1=genes(parent1),
+            parent2=genes(parent2),
+            rates1=parent1.mutation_rates(),
+            rates2=parent2.mutation_rates(),
+            child1=genes(children[0]),
+            child2=genes(children[1]),
+            mutation_rate=mutation_rate,
+            rng=rng
+        )
+
+        return children
+    
+    def _breed(self,
+               parent1:         Sequence[Sequence[NDArray[np.float32]]],
+               parent2:         Sequence[Sequence[NDArray[np.float32]]],
+               rates1:          NDArray[np.float64]|Sequence[float],
+               rates2:          NDArray[np.float64]|Sequence[float],
+               child1:          Sequence[Sequence[NDArray[np.float32]]],
+               child2:          Sequence[Sequence[NDArray[np.float32]]],
+               mutation_rate:   float|None,
+               rng:             np.random.Generator|None) -> None:
+        
+        rng = rng if rng else global_rng()
+
+        for layout,xx,yy,xy,yx,rate1,rate2 in zip(self._chromosomes, parent1, parent2, child1, child2, rates1, rates2, strict=True):
+            CP = rng.uniform(0,1)
+
+            for (start,end,row_size),*genes in zip(layout, xx, yy, xy, yx, strict=True):
+                cross_over(*genes, border=int(CP*((end - start)//row_size))*row_size)
+
+            for genes,rate in ((xy, rate1*CP + rate2*(1 - CP)), (yx, rate2*CP + rate1*(1 - CP))):
+                for gene in genes:
+                    mutate(gene, mutation_rate if mutation_rate else rate, rng=rng)
+
+
+def global_rng() -> np.random.Generator:
+    # Seeded from the global numpy state, so that np.random.seed keeps breeding without an rng reproducible.
+    return np.random.default_rng(np.random.randint(0, 2**63, dtype=np.int64))
+
+def cross_over(xx:      NDArray[np.float32],
+               yy:      NDArray[np.float32],
+               xy:      NDArray[np.float32],
+               yx:      NDArray[np.float32],
+               border:  int) -> None:
+    xy[:border] = xx[:border]
+    xy[border:] = yy[border:]
+
+    yx[border:] = xx[border:]
+    yx[:border] = yy[:border]
+
+def mutate(genes:           NDArray[np.float32],
+           mutation_rate:   float,
+           rng:             np.random.Generator|None = None) -> None:
+    rng = rng if rng else global_rng()
+    indices = mutation_indices(genes.size, mutation_rate, rng=rng)
+    genes[indices] += rng.standard_normal(indices.size, dtype=np.float32)
+
+def mutation_indices(size:            int,
+                     mutation_rate:   float,
+                     rng:             np.random.Generator|None = None) -> NDArray[np.int64]:
+    # Every gene mutates independently with probability mutation_rate. The gaps between mutated positions
+    # are then geometrically distributed, so the positions can be drawn in O(count) and in sorted order,
+    # without a dense mask or a permutation of every index.
+    rng = rng if rng else global_rng()
+    if mutation_rate <= 0.0:
+        return np.empty(0, dtype=np.int64)
+    if mutation_rate >= 1.0:
+        return np.arange(size, dtype=np.int64)
+
+    expected = size*mutation_rate
+    draws = int(expected + 4*np.sqrt(expected) + 16)
+    indices = np.cumsum(rng.geometric(mutation_rate, size=draws)) - 1
+    while indices[-1] < size:
+        indices = np.concatenate((indices, indices[-1] + np.cumsum(rng.geometric(mutation_rate, size=draws))))
+    return indices[:np.searchsorted(indices, size)]
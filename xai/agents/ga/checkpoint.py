@@ -0,0 +1,168 @@
+from typing import *
+from numpy.typing import NDArray
+
+import numpy as np
+import importlib
+import struct
+import json
+import os
+
+from ...util import Device
+
+if TYPE_CHECKING:
+    from numpy import generic
+    from ...games import Environment, Observation, Action, Reward
+    from ...agents import Genome, Policy
+
+G = TypeVar("G", bound="""Genome[
+            Environment[Observation[generic],Action,Reward[Observation[generic],Action]],
+            Observation[generic],
+            Policy[Action],
+            Action,
+            Reward[Observation[generic],Action]
+            ]""")
+
+CheckpointDataType = Literal["float32", "float16"]
+
+FORMAT = "xai.genomes"
+VERSION = 1
+
+_HEADER_FILE = "header.json"
+_WEIGHTS_FILE = "weights.npy"
+
+# The .npy header is written with a fixed size, so that appending a row only rewrites the shape in place.
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+_NPY_HEADER_SIZE = 128
+
+class Checkpoint(Generic[G]):
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        # A checkpoint is a directory with a JSON header naming the genome class, its config and layers,
+        # and a (rows x numel) .npy array of flat weights, one row per saved genome.
+        self.path = path
+
+        with open(os.path.join(path, _HEADER_FILE), "r") as file:
+            self.header: Dict[str,Any] = json.load(file)
+
+        assert self.header.get("format") == FORMAT, f"{path} is not a genome checkpoint."
+        assert self.header.get("version") == VERSION, f"Unsupported checkpoint version: {self.header.get('version')}."
+
+    @staticmethod
+    def create(path:        str,
+               template:    G,
+               dtype:       CheckpointDataType = "float32",
+               state:       Dict[str,Any]|None = None) -> "Checkpoint[G]":
+        os.makedirs(path, exist_ok=False)
+
+        numel = template.numel()
+        with open(os.path.join(path, _WEIGHTS_FILE), "wb") as file:
+            _write_npy_header(file, np.dtype(dtype), rows=0, numel=numel)
+
+        _write_header(path, {
+            "format": FORMAT,
+            "version": VERSION,
+            "class": f"{type(template).__module__}.{type(template).__qualname__}",
+            "config": template.config(),
+            "layers": [chromosome.spec() for chromosome in template],
+            "dtype": dtype,
+            "numel": numel,
+            "state": state,
+            "rows": []
+        })
+        return Checkpoint(path)
+
+    @staticmethod
+    def is_checkpoint(path: str) -> bool:
+        return os.path.isfile(os.path.join(path, _HEADER_FILE)) and os.path.isfile(os.path.join(path, _WEIGHTS_FILE))
+
+    def append(self,
+               genome:  G,
+               **meta:  Any) -> int:
+        assert [chromosome.spec() for chromosome in genome] == self.header["layers"], "Genome does not match the checkpoint layers."
+
+        index = len(self)
+        self.extend(genome.flatten()[None], [dict(meta, mutation_rates=list(genome.mutation_rates()))])
+        return index
+
+    def extend(self, 
+               weights: NDArray[np.float32], 
+               meta:    Sequence[Dict[str,Any]]) -> None:
+        # Appends rows of flat weights, each with metadata that holds at least its mutation rates.
+        assert weights.ndim == 2 and weights.shape[1] == self.header["numel"], f"Expected rows of {self.header['numel']} weights."
+        assert len(weights) == len(meta), "Every row needs its metadata."
+
+        # The weights go first and the header last, so a crash in between leaves rows that are ignored.
+        rows = np.ascontiguousarray(weights, dtype=self.header["dtype"])
+        with open(os.path.join(self.path, _WEIGHTS_FILE), "r+b") as file:
+            file.seek(_NPY_HEADER_SIZE + len(self)*rows.itemsize*rows.shape[1])
+            rows.tofile(file)
+            _write_npy_header(file, rows.dtype, rows=len(self) + len(rows), numel=rows.shape[1])
+
+        self.header["rows"].extend(meta)
+        _write_header(self.path, self.header)
+
+    def state(self) -> Dict[str,Any]|None:
+        return self.header.get("state")
+
+    def weights(self) -> NDArray[np.floating[Any]]:
+        # Memory mapped, so reading a single row does not read the whole checkpoint.
+        weights: NDArray[np.floating[Any]] = np.load(os.path.join(self.path, _WEIGHTS_FILE), mmap_mode="r")
+        return weights[:len(self)]
+
+    def meta(self, index: int = -1) -> Dict[str,Any]:
+        return self.header["rows"][index]
+
+    def genome(self,
+               index:   int = -1,
+               device:  Device = "cpu") -> G:
+        genome_type = self.genome_type()
+        genome: G = genome_type.from_config(device=device, config=self.header["config"])
+        assert [chromosome.spec() for chromosome in genome] == self.header["layers"], f"{genome_type} no longer matches the checkpoint layers."
+
+        genome.assign(np.asarray(self.weights()[index], dtype=np.float32))
+        genome.set_mutation_rates(self.meta(index)["mutation_rates"])
+        return genome
+
+    def genomes(self, device: Device = "cpu") -> Iterator[G]:
+        for index in range(len(self)):
+            yield self.genome(index, device=device)
+
+    def genome_type(self) -> Type[G]:
+        module, _, name = self.header["class"].rpartition(".")
+        return cast(Type[G], getattr(importlib.import_module(module), name))
+
+    def __len__(self) -> int:
+        return len(self.header["rows"])
+
+
+def save_genome(path:   str,
+                genome: G,
+                dtype:  CheckpointDataType = "float32",
+                **meta: Any) -> int:
+    # Appends to the checkpoint at path, which is created on the first save.
+    checkpoint = Checkpoint(path) if Checkpoint.is_checkpoint(path) else Checkpoint.create(path, genome, dtype=dtype)
+    return checkpoint.append(genome, **meta)
+
+def load_genome(path:   str,
+                index:  int = -1,
+                device: Device = "cpu") -> G:
+    return Checkpoint[G](path).genome(index, device=device)
+
+def _write_npy_header(file:     BinaryIO,
+                      dtype:    np.dtype[Any],
+                      rows:     int,
+                      numel:    int) -> None:
+    header = repr({
+        "descr": np.lib.format.dtype_to_descr(dtype),
+        "fortran_order": False,
+        "shape": (rows, numel)
+    })
+    file.seek(0)
+    file.write(_NPY_MAGIC + struct.pack("<H", _NPY_HEADER_SIZE - 10) + header.ljust(_NPY_HEADER_SIZE - 11).encode("latin1") + b"\n")
+
+def _write_header(path: str, header: Dict[str,Any]) -> None:
+    temporary = os.path.join(path, f"{_HEADER_FILE}.tmp")
+    with open(temporary, "w") as file:
+        json.dump(header, file)
+    os.replace(temporary, os.path.join(path, _HEADER_FILE))
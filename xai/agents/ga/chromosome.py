@@ -1,11 +1,13 @@
 from typing import *
 from typing import Any
+from numpy.typing import NDArray
 
 import numpy as np
 import copy
 import torch
 
 from ...util import Device, DataType, literals
+from .breeder import mutation_indices, global_rng
 
 class Chromosome:
 
@@ -14,13 +16,15 @@ class Chromosome:
                  out_features:  int, 
                  device:        Device,
                  dtype:         DataType,
-                 mutation_rate: float = 0.05) -> None:
+                 mutation_rate: float = 0.05,
+                 sparse_input:  bool = False) -> None:
         
         self._in_features = in_features
         self._out_features = out_features
         self._device = device
         self._dtype = dtype
         self._mutation_rate = mutation_rate
+        self._sparse_input = sparse_input
         self._genes = torch.nn.Linear(
             in_features=self._in_features, 
             out_features=self._out_features,
@@ -34,18 +38,25 @@ class Chromosome:
     def forward(self, tensor: torch.FloatTensor) -> torch.FloatTensor:
         input_device = tensor.device
         X = tensor.to(self._device)
-        Y = self._genes.forward(X)
+        if self._sparse_input:
+            Y = sparse_input_linear(X, self._genes.weight, self._genes.bias)
+        else:
+            Y = self._genes.forward(X)
         return cast(torch.FloatTensor, Y.to(input_device))
-        
+    
+    def sparse_input(self) -> bool:
+        return self._sparse_input
+    
     def mutate(self, mutation_rate: float|None = None) -> None:
         mutation_rate = mutation_rate if mutation_rate else self._mutation_rate
         device = self._device
 
+        rng = global_rng()
+
         for gene in self:
-            cond = np.random.uniform(low=0, high=1, size=gene.shape) < mutation_rate
-            mutation = np.random.normal(size=(np.count_nonzero(cond),))
-            gene[torch.from_numpy(cond).to(device)] += torch.from_numpy(mutation)\
-                .float()\
+            indices = mutation_indices(gene.nelement(), mutation_rate, rng=rng)
+            mutation = rng.standard_normal(indices.size, dtype=np.float32)
+            gene.view(-1)[torch.from_numpy(indices).to(device)] += torch.from_numpy(mutation)\
                 .to(device)
         
     def cross_over(self, 
@@ -83,6 +94,59 @@ class Chromosome:
 
     def copy(self) -> Self:
         return copy.deepcopy(self)
+
+    def numel(self) -> int:
+        return sum(gene.nelement() for gene in self)
+    
+    def mutation_rate(self) -> float:
+        return self._mutation_rate
+
+    def spec(self) -> Dict[str,Any]:
+        return {
+            "in_features": self._in_features,
+            "out_features": self._out_features,
+            "dtype": self._dtype,
+            "sparse_input": self._sparse_input
+        }
+    
+    def set_mutation_rate(self, mutation_rate: float) -> None:
+        self._mutation_rate = mutation_rate
+
+    def flatten(self, out: NDArray[np.float32]|None = None) -> NDArray[np.float32]:
+        if out is None:
+            out = np.empty(self.numel(), dtype=np.float32)
+
+        offset = 0
+        for gene in self:
+            size = gene.nelement()
+            out[offset:offset + size] = gene.detach().cpu().numpy().reshape(-1)
+            offset += size
+
+        return out
+
+    def bind(self, buffer: NDArray[np.float32], copy: bool = True) -> None:
+        assert self._device == "cpu", "Only chromosomes residing on the cpu can be bound to a buffer."
+        assert buffer.size == self.numel()
+
+        offset = 0
+        for name,gene in tuple(self._genes.named_parameters()):
+            size = gene.nelement()
+            view = torch.from_numpy(buffer[offset:offset + size]).view(gene.shape)
+            if copy:
+                view.copy_(gene.detach())
+            setattr(self._genes, name, torch.nn.Parameter(view, requires_grad=False))
+            offset += size
+
+    def view(self, buffer: NDArray[np.float32]) -> "Chromosome":
+        chromosome = copy.copy(self)
+        chromosome._genes = torch.nn.Linear(
+            in_features=self._in_features, 
+            out_features=self._out_features,
+            device="meta",
+            dtype=literals.torch_dtype(self._dtype)
+        )
+        chromosome.bind(buffer, copy=False)
+        return chromosome
     
     def __call__(self, tensor: torch.FloatTensor) -> torch.FloatTensor:
         return self.forward(tensor)
@@ -94,4 +158,41 @@ class Chromosome:
         return f"Chromosome(mutation_rate={self._mutation_rate})"
     
     def __iter__(self) -> Iterator[torch.nn.Parameter]:
-        return self._genes.parameters()
\ No newline at end of file
+        return self._genes.parameters()
+
+
+def sparse_input_linear(tensor:  torch.Tensor, 
+                        weight:  torch.Tensor, 
+                        bias:    torch.Tensor) -> torch.Tensor:
+    return cast(torch.Tensor, _SparseInputLinear.apply(tensor, weight, bias))
+
+class _SparseInputLinear(torch.autograd.Function):
+    # Same result as a dense linear layer, but only the weight columns belonging to non-zero inputs are read.
+    # The gradient w.r.t. the input stays dense and exact, since the saliency is also needed for the zero inputs.
+    generate_vmap_rule = True
+
+    @staticmethod
+    def forward(tensor: torch.Tensor, weight: torch.Tensor, bias: torch.Tensor) -> torch.Tensor:
+        if weight.dim() == 2:
+            idx = tensor.nonzero().squeeze(1)
+            return torch.addmv(bias, weight.index_select(1, idx), tensor.index_select(0, idx))
+        else:
+            idx = tensor.ne(0).any(dim=0).nonzero().squeeze(1)
+            return torch.baddbmm(
+                bias.unsqueeze(2), 
+                weight.index_select(2, idx),
+                tensor.index_select(1, idx).unsqueeze(2)
+            ).squeeze(2)
+
+    @staticmethod
+    def setup_context(ctx: Any, inputs: Tuple[torch.Tensor,torch.Tensor,torch.Tensor], output: torch.Tensor) -> None:
+        _, weight, _ = inputs
+        ctx.save_for_backward(weight)
+
+    @staticmethod
+    def backward(ctx: Any, grad: torch.Tensor) -> Tuple[torch.Tensor,None,None]:
+        weight, = ctx.saved_tensors
+        if weight.dim() == 2:
+            return weight.t() @ grad, None, None
+        else:
+            return torch.bmm(weight.transpose(1, 2), grad.unsqueeze(2)).squeeze(2), None, None
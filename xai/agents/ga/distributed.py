@@ -0,0 +1,319 @@
+from typing import *
+from collections import OrderedDict, deque
+from multiprocessing.connection import Listener, Client, Connection, wait
+
+import multiprocessing as mp
+import itertools
+import threading
+import argparse
+import queue
+import time
+import os
+
+from ...util import ByteSize, bytesize
+from .lineage import Lineage, rebuild
+
+if TYPE_CHECKING:
+    from numpy import generic
+    from ...games import Environment, Observation, Action, Reward
+    from ...agents import Genome, Policy, Specimen, AgentResult
+
+G = TypeVar("G", bound="""Genome[
+            Environment[Observation[generic],Action,Reward[Observation[generic],Action]],
+            Observation[generic],
+            Policy[Action],
+            Action,
+            Reward[Observation[generic],Action]
+            ]""")
+
+# Evaluates populations on worker processes on other nodes, which connect to the coordinator over TCP:
+#
+#   coordinator node:   population.evolve(..., coordinator=Coordinator(address=("0.0.0.0", 6000), workers=96))
+#   every worker node:  python -m xai.agents.ga.distributed <coordinator host>:6000 --processes 48
+#
+# Messages are pickles, so whoever authenticates can run code on the other side. Both sides therefore require a
+# secret authkey, given explicitly or by the XAI_AUTHKEY environment variable, and the coordinator only listens on
+# localhost unless another address is given.
+#
+# Every worker keeps the genomes it was sent in a LRU of as many genomes as fit in its share of the cache memory of
+# the node, which the coordinator mirrors. Genomes are sent as seed chains, see Lineage, i.e. the ancestry of every
+# genome the worker has to breed from genomes it holds, so only the flat weights of materialized ancestors, every
+# materialize_interval generations, are sent to every worker once. Only results, i.e. fitness vectors and game
+# stats, are sent back.
+
+_Task = Tuple[int,"Specimen[G]",G]
+
+class Coordinator(Generic[G]):
+
+    def __init__(self,
+                 address:               Tuple[str,int] = ("127.0.0.1", 6_000),
+                 workers:               int = 1,
+                 authkey:               bytes|None = None,
+                 in_flight:             int = 2,
+                 materialize_interval:  int = 10) -> None:
+        super().__init__()
+        assert workers > 0, "At least one worker must connect."
+        assert in_flight > 0, "Every worker must be sent at least one task at a time."
+
+        self.address = address
+        self.workers = workers
+        self.authkey = _authkey(authkey)
+        self.in_flight = in_flight
+        self.materialize_interval = materialize_interval
+
+        self._listener: Listener|None = None
+        self._joined: "queue.Queue[Connection]" = queue.Queue()
+        self._nodes: List[_Node] = []
+        self._template: G|None = None
+        self._next_task = 0
+        self._lineage = Lineage[G](materialize_interval)
+        self._sent: Set[str] = set()
+
+    def __enter__(self) -> "Coordinator[G]":
+        self._listener = Listener(self.address, authkey=self.authkey)
+        threading.Thread(target=self._accept, daemon=True).start()
+
+        # Workers may join, or leave, at any time later on, but evaluation waits until the first ones have joined.
+        while len(self._nodes) < self.workers:
+            self._nodes.append(_Node(self._joined.get()))
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        for node in self._nodes:
+            try:
+                node.connection.send(("stop",))
+                node.connection.close()
+            except OSError:
+                pass
+        self._nodes.clear()
+
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.close()
+
+    def evaluate(self,
+                 tasks:     Iterable[_Task[G]],
+                 settings:  Dict[str,Any],
+                 sources:   Mapping[str,"Specimen[G]"]|None = None) -> Iterator[Tuple[int,"AgentResult"]]:
+        # Yields (index, result) of every (index, specimen, genome) task in the order they finish. Sources are
+        # the specimens that offspring may be bred from, i.e. the parents of the generation.
+        assert self._listener is not None, "The coordinator must be entered before evaluating."
+        sources = sources if sources is not None else {}
+
+        # Only the ancestors of the sources and of the genomes of the previous evaluation are kept.
+        self._lineage.prune(itertools.chain(sources, self._sent))
+        self._sent = set()
+        iterator = iter(tasks)
+        retries: Deque[_Task[G]] = deque()
+        exhausted = False
+
+        while True:
+            self._admit()
+            if not self._nodes:
+                self._nodes.append(_Node(self._joined.get()))
+
+            for node in self._nodes:
+                while len(node.outstanding) < self.in_flight:
+                    task = retries.popleft() if retries else None
+                    if task is None and not exhausted:
+                        task = next(iterator, None)
+                        exhausted = task is None
+                    if task is None:
+                        break
+                    self._send(node, task, settings, sources)
+
+            if exhausted and not retries and not any(node.outstanding for node in self._nodes):
+                return
+
+            by_connection = {node.connection: node for node in self._nodes}
+            for connection in wait(list(by_connection), timeout=1.0):
+                node = by_connection[cast(Connection, connection)]
+                try:
+                    _, task_id, result = node.connection.recv()
+                except (EOFError, OSError):
+                    # The tasks of a lost worker are sent to the others, which might have to wait for a new worker.
+                    print(f"Lost a worker with {len(node.outstanding)} unfinished tasks.")
+                    retries.extend(node.outstanding.values())
+                    self._nodes.remove(node)
+                    continue
+
+                index, _, _ = node.outstanding.pop(task_id)
+                yield index, result
+
+    def _send(self,
+              node:     "_Node",
+              task:     _Task[G],
+              settings: Dict[str,Any],
+              sources:  Mapping[str,"Specimen[G]"]) -> None:
+        index, specimen, genome = task
+
+        if self._template is None:
+            self._template = genome
+
+        # Parents that were never sent, e.g. those of a resumed population, are recorded from the sources.
+        for parent in specimen.ancestry.parents if specimen.ancestry is not None else ():
+            if parent not in self._lineage and parent in sources:
+                self._lineage.record(sources[parent])
+        self._lineage.record(specimen)
+        self._sent.add(specimen.id)
+
+        # Workers answer the template with the number of genomes they can hold. A failed send or receive surfaces
+        # as a lost connection when waiting for results.
+        if not node.initialized:
+            node.initialized = True
+            try:
+                node.connection.send(("template", self._template))
+                _, node.capacity = node.connection.recv()
+            except (EOFError, OSError):
+                pass
+
+        # The operations on the mirror match those of the worker, in the same order.
+        chain = self._lineage.encode(specimen.id, held=node.genomes)
+        for genome_id in chain.dependencies:
+            node.touch(genome_id)
+        for genome_id in itertools.chain(chain.materialized, (genome_id for genome_id,_ in chain.records)):
+            node.hold(genome_id)
+
+        task_id = self._next_task
+        self._next_task += 1
+        node.outstanding[task_id] = task
+
+        try:
+            node.connection.send(("evaluate", task_id, settings, specimen.id, chain))
+        except OSError:
+            pass
+
+    def _admit(self) -> None:
+        while True:
+            try:
+                self._nodes.append(_Node(self._joined.get_nowait()))
+            except queue.Empty:
+                return
+
+    def _accept(self) -> None:
+        listener = self._listener
+        while listener is not None:
+            try:
+                self._joined.put(listener.accept())
+            except (OSError, EOFError, mp.AuthenticationError):
+                if self._listener is None:
+                    return
+
+
+class _Node:
+
+    def __init__(self, connection: Connection) -> None:
+        super().__init__()
+        self.connection = connection
+        self.capacity = 0
+        self.initialized = False
+        self.genomes: OrderedDict[str,None] = OrderedDict()
+        self.outstanding: Dict[int,_Task[Any]] = {}
+
+    def touch(self, genome_id: str) -> None:
+        self.genomes.move_to_end(genome_id)
+
+    def hold(self, genome_id: str) -> None:
+        self.genomes[genome_id] = None
+        self.genomes.move_to_end(genome_id)
+        while len(self.genomes) > self.capacity:
+            self.genomes.popitem(last=False)
+
+
+def work(address:       Tuple[str,int], 
+         authkey:       bytes|None = None,
+         patience:      float = 600.0,
+         cache_size:    ByteSize|None = None) -> None:
+    # Evaluates the tasks of a coordinator until it stops. The coordinator may start up to patience seconds later.
+    # The genomes held are bounded by cache_size, by default a quarter of the available memory per cpu.
+    if cache_size is None:
+        cache_size = ByteSize(bytes=bytesize.ram_available().bytes()/4/(os.cpu_count() or 1))
+
+    from .population import _call_genome
+    import torch
+
+    torch.set_num_threads(1)
+
+    deadline = time.monotonic() + patience
+    while True:
+        try:
+            connection = Client(address, authkey=_authkey(authkey))
+            break
+        except ConnectionRefusedError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(1.0)
+
+    with connection:
+        template: Any = None
+        genomes: OrderedDict[str,Any] = OrderedDict()
+        capacity = 0
+
+        def hold(genome_id: str, genome: Any) -> None:
+            genomes[genome_id] = genome
+            genomes.move_to_end(genome_id)
+            while len(genomes) > capacity:
+                genomes.popitem(last=False)
+
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError:
+                return
+
+            if message[0] == "stop":
+                return
+            elif message[0] == "template":
+                _, template = message
+                capacity = int(cache_size.bytes()//template.byte_size().bytes())
+                connection.send(("capacity", capacity))
+                continue
+
+            # The operations on the genomes match those of the mirror of the coordinator, in the same order.
+            _, task_id, settings, genome_id, chain = message
+            dependencies = {dependency: genomes[dependency] for dependency in chain.dependencies}
+            for dependency in chain.dependencies:
+                genomes.move_to_end(dependency)
+
+            bred = rebuild(template, dependencies, chain)
+            for bred_id,genome in bred.items():
+                hold(bred_id, genome)
+
+            genome = bred[genome_id] if genome_id in bred else dependencies[genome_id]
+            connection.send(("result", task_id, _call_genome(genome, **settings)))
+
+
+def _authkey(authkey: bytes|None = None) -> bytes:
+    # There is no default, since anyone who knows the key can run code on both sides.
+    if authkey is None and os.environ.get("XAI_AUTHKEY"):
+        authkey = os.environ["XAI_AUTHKEY"].encode()
+    if not authkey:
+        raise ValueError("No authkey given. Pass one or set the XAI_AUTHKEY environment variable to a shared secret.")
+    return authkey
+
+def _main() -> None:
+    parser = argparse.ArgumentParser(description="Evaluates genomes for a distributed population.")
+    parser.add_argument("address", help="host:port of the coordinator.")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="Number of worker processes.")
+    parser.add_argument("--authkey", default=None, help="Shared secret of the coordinator, by default XAI_AUTHKEY.")
+    parser.add_argument("--cache-memory", type=float, default=None, help="GB of genomes held by all processes together, by default a quarter of the available memory.")
+    arguments = parser.parse_args()
+
+    try:
+        authkey = _authkey(None if arguments.authkey is None else arguments.authkey.encode())
+    except ValueError as error:
+        parser.error(str(error))
+
+    # Every process gets an equal share of the cache memory of the node.
+    node_cache = bytesize.ram_available().bytes()/4 if arguments.cache_memory is None else ByteSize(gigabytes=arguments.cache_memory).bytes()
+    cache_size = ByteSize(bytes=node_cache/arguments.processes)
+
+    host, port = arguments.address.rsplit(":", 1)
+    workers = [mp.Process(target=work, args=((host, int(port)), authkey, 600.0, cache_size)) for _ in range(arguments.processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,120 @@
+from typing import *
+from collections import OrderedDict
+from numpy.typing import NDArray
+
+import numpy as np
+import hashlib
+
+from ...agents import Fitness
+
+if TYPE_CHECKING:
+    from numpy import generic
+    from ...games import Environment, Observation, Action, Reward
+    from ...agents import Genome, Policy, AgentResult
+
+G = TypeVar("G", bound="""Genome[
+            Environment[Observation[generic],Action,Reward[Observation[generic],Action]],
+            Observation[generic],
+            Policy[Action],
+            Action,
+            Reward[Observation[generic],Action]
+            ]""")
+
+class EvaluationCache(Generic[G]):
+
+    def __init__(self,
+                 episodes:  int = 1,
+                 capacity:  int = 100_000) -> None:
+        super().__init__()
+        assert episodes > 0, "At least one episode must be played before a result is reused."
+        assert capacity > 0, "The cache must hold at least one genome."
+
+        # A genome is played until episodes episodes are recorded, after which the aggregate is reused.
+        self.episodes = episodes
+        self.capacity = capacity
+        self._entries: OrderedDict[str,_Episodes] = OrderedDict()
+
+    def key(self,
+            genome:     G,
+            seed:       int|None = None,
+            **config:   Any) -> str:
+        # Identical weights played in the same environment with the same evaluation config share a key.
+        digest = hashlib.blake2b(genome.content_hash().encode(), digest_size=16)
+        digest.update(repr(seed).encode())
+        digest.update(repr(sorted(config.items())).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> "AgentResult|None":
+        entry = self._entries.get(key)
+        if entry is None or entry.count() < self.episodes:
+            return None
+
+        self._entries.move_to_end(key)
+        return entry.aggregate()
+
+    def record(self, key: str, result: "AgentResult") -> "AgentResult":
+        # Aborted episodes are incomplete, so they are neither recorded nor aggregated.
+        if result["aborted"]:
+            return result
+
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Episodes()
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+        self._entries.move_to_end(key)
+        entry.add(result)
+        return entry.aggregate()
+
+    def statistics(self, key: str) -> Dict[str,float]|None:
+        entry = self._entries.get(key)
+        return None if entry is None else entry.statistics()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _Episodes:
+
+    def __init__(self) -> None:
+        self.fitness = Fitness()
+        self.game_rewards: List[float] = []
+        self.steps_played: List[int] = []
+
+    def count(self) -> int:
+        return len(self.game_rewards)
+
+    def add(self, result: "AgentResult") -> None:
+        self.fitness += result["fitness"]
+        self.game_rewards.append(float(result["game_reward"]))
+        self.steps_played.append(int(result["steps_played"]))
+
+    def aggregate(self) -> "AgentResult":
+        # The mean over every recorded episode.
+        return {
+            "steps_played": round(sum(self.steps_played)/self.count()),
+            "game_reward": sum(self.game_rewards)/self.count(),
+            "fitness": Fitness(schema=self.fitness.schema, values=self.fitness.numpy()/self.count()),
+            "aborted": False,
+            "episodes": self.count()
+        }
+
+    def statistics(self) -> Dict[str,float]:
+        game_rewards: NDArray[np.float64] = np.array(self.game_rewards)
+        steps_played: NDArray[np.float64] = np.array(self.steps_played, dtype=np.float64)
+        return {
+            "episodes": self.count(),
+            "mean_game_reward": float(game_rewards.mean()),
+            "std_game_reward": float(game_rewards.std()),
+            "min_game_reward": float(game_rewards.min()),
+            "max_game_reward": float(game_rewards.max()),
+            "mean_steps_played": float(steps_played.mean()),
+            "std_steps_played": float(steps_played.std())
+        }
@@ -1,12 +1,19 @@
 from typing import *
+from numpy.typing import NDArray
+
+import numpy as np
+import hashlib
+import torch
+import copy
 
 from ...util import Device
-from ...agents import Agent, Chromosome
+from ...agents import Agent, Chromosome, Memory, Breeder
 
 if TYPE_CHECKING:
     from numpy import generic
     from ...games import Environment, Observation, Action, Reward
     from ...agents import Policy, Population
+    from .checkpoint import CheckpointDataType
     
 E = TypeVar("E", bound="Environment[Observation[generic],Action,Reward[Observation[generic],Action]]")
 O = TypeVar("O", bound="Observation[generic]")
@@ -22,6 +29,14 @@ class Genome(Agent[E,O,P,A,R]):
         self.mutation_rate = mutation_rate
         super().__init__(device)
 
+    def config(self) -> Dict[str,Any]:
+        # JSON serializable arguments of the constructor, besides the device.
+        return {"mutation_rate": self.mutation_rate}
+
+    @classmethod
+    def from_config(cls, device: Device, config: Dict[str,Any]) -> Self:
+        return cls(device, **config)
+
     def populate(self, 
                  number_of_genomes: int, 
                  in_memory:         bool = False) -> "Population[Self]":
@@ -34,7 +49,12 @@ class Genome(Agent[E,O,P,A,R]):
     
     def breed(self, 
               partner:          Self, 
-              mutation_rate:    float|None = None) -> Tuple[Self,Self]:
+              mutation_rate:    float|None = None,
+              rng:              np.random.Generator|None = None) -> Tuple[Self,Self]:
+        
+        if self.device == "cpu" and partner.device == "cpu":
+            return Breeder(self).breed_genomes(self, partner, mutation_rate=mutation_rate, rng=rng)
+
         child1 = self.clone()
         child2 = partner.clone()
         
@@ -49,6 +69,73 @@ class Genome(Agent[E,O,P,A,R]):
     
     def chromosomes(self) -> Tuple[Chromosome,...]:
         return tuple(self)
+    
+    def numel(self) -> int:
+        return sum(chromosome.numel() for chromosome in self)
+    
+    def mutation_rates(self) -> Tuple[float,...]:
+        return tuple(chromosome.mutation_rate() for chromosome in self)
+    
+    def set_mutation_rates(self, mutation_rates: Iterable[float]) -> None:
+        for chromosome,mutation_rate in zip(self, mutation_rates, strict=True):
+            chromosome.set_mutation_rate(float(mutation_rate))
+
+    def flatten(self, out: NDArray[np.float32]|None = None) -> NDArray[np.float32]:
+        if out is None:
+            out = np.empty(self.numel(), dtype=np.float32)
+
+        for chromosome,buffer in zip(self, self._split(out)):
+            chromosome.flatten(out=buffer)
+
+        return out
+
+    def content_hash(self) -> str:
+        # Only the weights and the type determine how a genome plays, not its mutation rates.
+        digest = hashlib.blake2b(type(self).__qualname__.encode(), digest_size=16)
+        digest.update(self.flatten().tobytes())
+        return digest.hexdigest()
+
+    def assign(self, buffer: NDArray[np.float32]) -> None:
+        # Copies the flat weights into the genes, on whichever device they reside.
+        for chromosome,chromosome_buffer in zip(self, self._split(buffer)):
+            offset = 0
+            for gene in chromosome:
+                size = gene.nelement()
+                gene.data.copy_(torch.from_numpy(chromosome_buffer[offset:offset + size]).view(gene.shape))
+                offset += size
+
+    def save_checkpoint(self, 
+                        path:   str, 
+                        dtype:  "CheckpointDataType" = "float32",
+                        **meta: Any) -> int:
+        from .checkpoint import save_genome
+        return save_genome(path, self, dtype=dtype, **meta)
+
+    def is_view(self, buffer: NDArray[np.float32]) -> bool:
+        # Whether every gene still resides in buffer, i.e. none was replaced since the genome was bound to it.
+        address = buffer.ctypes.data
+        for chromosome in self:
+            for gene in chromosome:
+                if gene.device.type != "cpu" or gene.data_ptr() != address:
+                    return False
+                address += gene.nelement()*gene.element_size()
+        return buffer.size == self.numel()
+
+    def bind(self, buffer: NDArray[np.float32], copy: bool = True) -> None:
+        for chromosome,chromosome_buffer in zip(self, self._split(buffer)):
+            chromosome.bind(chromosome_buffer, copy=copy)
+    
+    def view(self, buffer: NDArray[np.float32]) -> Self:
+        # Everything but the chromosomes is copied, so that views never share mutable state such as memory.
+        memo: Dict[int,Any] = {id(self.stats): dict(self.stats)}
+        memo.update((id(chromosome), chromosome.view(chromosome_buffer)) for chromosome,chromosome_buffer in zip(self, self._split(buffer)))
+        memo.update((id(layer), Memory()) for layer in self._layers if isinstance(layer, Memory))
+        return copy.deepcopy(self, memo=memo)
+    
+    def _split(self, buffer: NDArray[np.float32]) -> Tuple[NDArray[np.float32],...]:
+        assert buffer.size == self.numel()
+        offsets = np.cumsum([chromosome.numel() for chromosome in self])[:-1]
+        return tuple(np.split(buffer, offsets))
 
     def __iter__(self) -> Iterator[Chromosome]:
         for layer in self._layers:
@@ -0,0 +1,208 @@
+from typing import *
+from torch import FloatTensor
+
+import numpy as np
+import copy
+import torch
+
+from ...agents import Chromosome, Memory, Fitness
+from ...agents.ga.chromosome import sparse_input_linear
+from ...games import VectorEnvironment
+
+if TYPE_CHECKING:
+    from numpy import generic
+    from ...games import Environment, Observation, Action, Reward
+    from ...agents import Genome, Policy, AgentResult, Race
+
+G = TypeVar("G", bound="""Genome[
+            Environment[Observation[generic],Action,Reward[Observation[generic],Action]],
+            Observation[generic],
+            Policy[Action],
+            Action,
+            Reward[Observation[generic],Action]
+            ]""")
+
+class GenomeBatch(Generic[G]):
+
+    def __init__(self, genomes: Sequence[G]) -> None:
+        super().__init__()
+        assert len(genomes) > 0, "A batch must contain at least one genome."
+
+        self._genomes = tuple(genomes)
+        self._layers = tuple(
+            self._stack(layers) for layers in zip(*(genome._layers for genome in self._genomes), strict=True)
+        )
+
+    def size(self) -> int:
+        return len(self._genomes)
+    
+    def _stack(self, layers: Sequence[Callable[[FloatTensor],FloatTensor]]) -> Callable[[FloatTensor],FloatTensor]:
+        if isinstance(layers[0], Chromosome):
+            return _StackedChromosome(cast(Sequence[Chromosome], layers))
+        elif isinstance(layers[0], Memory):
+            return Memory()
+        else:
+            return copy.deepcopy(layers[0])
+
+    def reset(self) -> None:
+        # Resets the stacked layers and per-genome state such as salience samplers, as Agent.play does.
+        for layer in self._layers:
+            if isinstance(layer, Memory):
+                layer.reset()
+        for genome in self._genomes:
+            genome.reset()
+
+    def forward(self,
+                observations:   Sequence["Observation[generic]|None"]) -> Tuple["Policy[Action]|None",...]:
+
+        inputs: List[FloatTensor|None] = []
+        for genome,observation in zip(self._genomes, observations, strict=True):
+            if observation is None:
+                inputs.append(None)
+            else:
+                X = genome.in_transform(observation)
+                X.requires_grad = True
+                inputs.append(X)
+
+        template = next(X for X in inputs if X is not None)
+        A = cast(FloatTensor, torch.stack([template.new_zeros(template.shape) if X is None else X for X in inputs]))
+        for layer in self._layers:
+            A = layer(A)
+
+        return tuple(
+            None if X is None else genome.out_transform(
+                network_input=X,
+                network_output=cast(FloatTensor, Y),
+                actions=genome._actions
+            )
+            for genome,X,Y in zip(self._genomes, inputs, A)
+        )
+
+    def play(self,
+             envs:              "VectorEnvironment[Observation[generic],Action,Reward[Observation[generic],Action]]|Sequence[Environment[Observation[generic],Action,Reward[Observation[generic],Action]]]|None" = None,
+             max_time_steps:    int = 10_000,
+             respawn:           bool = True,
+             stochastic:        bool = True,
+             decision_interval: int = 1,
+             race:              "Race|None" = None) -> Tuple["AgentResult",...]:
+
+        assert decision_interval > 0, "Decision interval must be positive."
+
+        if envs is None:
+            envs = VectorEnvironment(tuple(genome.create_environment() for genome in self._genomes))
+        elif not isinstance(envs, VectorEnvironment):
+            envs = VectorEnvironment(envs)
+
+        assert envs.size() == self.size(), f"Expected {self.size()} environments, got {envs.size()}."
+        assert not envs.auto_reset, "Every slot must play exactly one episode."
+
+        envs.reset()
+        self.reset()
+
+        lives = envs.lives()
+        fitnesses = [Fitness() for _ in range(self.size())]
+        game_rewards: List[int|float] = [0 for _ in range(self.size())]
+        steps = np.zeros(self.size(), dtype=np.int64)
+        active = np.ones(self.size(), dtype=np.bool_)
+        aborted = np.zeros(self.size(), dtype=np.bool_)
+        progresses: List[List[List[float]]] = [[] for _ in range(self.size())]
+
+        while True:
+            active &= envs.running() & (steps < max_time_steps) & ~aborted
+            if not respawn:
+                active &= envs.lives() >= lives
+
+            if not active.any():
+                break
+
+            observations = [observation if running else None for observation,running in zip(envs.observations(), active)]
+            policies = self.forward(observations)
+            actions = [None if policy is None else policy.action() for policy in policies]
+
+            self._prefetch_gradients(policies, actions)
+
+            rewards = envs.step(actions, stochastic=stochastic, steps=np.minimum(decision_interval, max_time_steps - steps).tolist())
+
+            for slot,(genome,observation,policy,action,reward) in enumerate(zip(self._genomes, observations, policies, actions, rewards)):
+                if policy is None or observation is None or action is None or reward is None:
+                    continue
+
+                game_rewards[slot] += reward.native_game_reward()
+                fitnesses[slot] += genome.fitness(
+                    game_step=steps[slot],
+                    observation=observation,
+                    policy=policy,
+                    action=action,
+                    reward=reward
+                )
+                steps[slot] += len(reward.values)
+
+                if race is not None:
+                    aborted[slot] = race.overtaken(int(steps[slot]), fitnesses[slot], progresses[slot])
+
+        results: List["AgentResult"] = []
+        for step,game_reward,fitness,slot_aborted,progress in zip(steps, game_rewards, fitnesses, aborted, progresses):
+            result: "AgentResult" = {
+                "steps_played": int(step),
+                "game_reward": game_reward,
+                "fitness": fitness,
+                "aborted": bool(slot_aborted)
+            }
+            if race is not None:
+                result["race_progress"] = progress
+            results.append(result)
+
+        return tuple(results)
+
+    def _prefetch_gradients(self,
+                            policies:   Sequence["Policy[Action]|None"],
+                            actions:    Sequence["Action|None"]) -> None:
+
+        # The slots are independent, so one backward pass of the summed selected outputs
+        # yields the gradient of every slot w.r.t. its own input at the cost of a single slot.
+        prefetched = False
+
+        def prefetch() -> None:
+            nonlocal prefetched
+            if prefetched:
+                return
+            prefetched = True
+
+            selected: List[FloatTensor] = []
+            for policy,action in zip(policies, actions):
+                if policy is not None and action is not None:
+                    policy.network_input().grad = None
+                    selected.append(policy.network_output(action))
+
+            cast(FloatTensor, torch.stack(selected).sum()).backward(retain_graph=True)
+
+            for policy,action in zip(policies, actions):
+                if policy is not None and action is not None:
+                    gradients = policy.network_input().grad
+                    assert gradients is not None
+                    policy.cache_gradients(action, gradients.numpy())
+
+        for policy in policies:
+            if policy is not None:
+                policy.prefetch_gradients(prefetch)
+
+    def __iter__(self) -> Iterator[G]:
+        return iter(self._genomes)
+
+
+class _StackedChromosome:
+
+    def __init__(self, chromosomes: Sequence[Chromosome]) -> None:
+        super().__init__()
+        weights, biases = zip(*(tuple(chromosome) for chromosome in chromosomes))
+        self._sparse_input = chromosomes[0].sparse_input()
+        self._weights = torch.stack(weights)
+        self._biases = torch.stack(biases)
+
+    def __call__(self, tensor: FloatTensor) -> FloatTensor:
+        X = tensor.to(self._weights.device)
+        if self._sparse_input:
+            Y = sparse_input_linear(X, self._weights, self._biases)
+        else:
+            Y = torch.baddbmm(self._biases.unsqueeze(2), self._weights, X.unsqueeze(2)).squeeze(2)
+        return cast(FloatTensor, Y.to(tensor.device))
@@ -0,0 +1,113 @@
+from typing import *
+from numpy.typing import NDArray
+
+import numpy as np
+import tempfile
+import os
+
+if TYPE_CHECKING:
+    from numpy import generic
+    from ...games import Environment, Observation, Action, Reward
+    from ...agents import Genome, Policy
+
+G = TypeVar("G", bound="""Genome[
+            Environment[Observation[generic],Action,Reward[Observation[generic],Action]],
+            Observation[generic],
+            Policy[Action],
+            Action,
+            Reward[Observation[generic],Action]
+            ]""")
+
+_SHARED_MEMORY_DIR = "/dev/shm"
+
+class GenomeStore(Generic[G]):
+
+    def __init__(self,
+                 template:  G,
+                 capacity:  int,
+                 path:      str|None = None) -> None:
+        super().__init__()
+
+        self.capacity = capacity
+        self._numel = template.numel()
+        self._chromosome_count = len(template.chromosomes())
+
+        if path is None:
+            directory = _SHARED_MEMORY_DIR if os.path.isdir(_SHARED_MEMORY_DIR) else None
+            fd, path = tempfile.mkstemp(suffix=".genomes", dir=directory)
+            os.close(fd)
+            self._owner = True
+        else:
+            self._owner = False
+
+        self.path = path
+
+        weights_bytes = capacity*self._numel*np.dtype(np.float32).itemsize
+        weights_bytes += -weights_bytes % np.dtype(np.float64).itemsize
+        rates_bytes = capacity*self._chromosome_count*np.dtype(np.float64).itemsize
+
+        self._arena = np.memmap(
+            filename=self.path,
+            dtype=np.uint8,
+            mode="w+" if self._owner else "r+",
+            shape=(weights_bytes + rates_bytes,)
+        )
+        self._weights: NDArray[np.float32] = self._arena[:weights_bytes]\
+            .view(np.float32)[:capacity*self._numel]\
+            .reshape(capacity, self._numel)
+        self._rates: NDArray[np.float64] = self._arena[weights_bytes:]\
+            .view(np.float64)\
+            .reshape(capacity, self._chromosome_count)
+
+        self._template = template.view(self._weights[0])
+
+    def numel(self) -> int:
+        return self._numel
+
+    def write(self, index: int, genome: G) -> None:
+        genome.flatten(out=self._weights[index])
+        self._rates[index] = genome.mutation_rates()
+
+    def read(self, index: int, genome: G) -> G:
+        genome.bind(self._weights[index], copy=False)
+        genome.set_mutation_rates(self._rates[index])
+        return genome
+
+    def view(self, index: int) -> G:
+        genome = self._template.view(self._weights[index])
+        genome.set_mutation_rates(self._rates[index])
+        return genome
+
+    def copy(self, index: int) -> G:
+        genome = self._template.view(self._weights[index].copy())
+        genome.set_mutation_rates(self._rates[index])
+        return genome
+
+    def weights(self, index: int) -> NDArray[np.float32]:
+        return self._weights[index]
+    
+    def rates(self, index: int) -> NDArray[np.float64]:
+        return self._rates[index]
+
+    def flush(self) -> None:
+        self._arena.flush()
+
+    def close(self) -> None:
+        del self._weights, self._rates, self._template, self._arena
+        if self._owner:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self) -> "GenomeStore[G]":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.capacity
+
+    def __reduce__(self) -> Tuple[Callable[..., "GenomeStore[G]"], Tuple[G,int,str]]:
+        return GenomeStore, (self._template, self.capacity, self.path)
@@ -0,0 +1,141 @@
+from typing import *
+from numpy.typing import NDArray
+
+import numpy as np
+
+from .specimen import Ancestry
+
+if TYPE_CHECKING:
+    from numpy import generic
+    from ...games import Environment, Observation, Action, Reward
+    from ...agents import Genome, Policy, Specimen
+
+G = TypeVar("G", bound="""Genome[
+            Environment[Observation[generic],Action,Reward[Observation[generic],Action]],
+            Observation[generic],
+            Policy[Action],
+            Action,
+            Reward[Observation[generic],Action]
+            ]""")
+
+_Weights = Tuple[NDArray[np.float32],Tuple[float,...]]
+
+class SeedChain(NamedTuple):
+    # Everything needed to rebuild a genome from genomes the receiver already holds: the held genomes it depends on,
+    # the flat weights and mutation rates of materialized ancestors, and the ancestry of every genome to breed, in order.
+    dependencies:   Tuple[str,...]
+    materialized:   Dict[str,_Weights]
+    records:        Tuple[Tuple[str,Ancestry],...]
+
+class Lineage(Generic[G]):
+
+    def __init__(self, materialize_interval: int = 10) -> None:
+        super().__init__()
+        assert materialize_interval >= 0, "Materialize interval must not be negative."
+
+        # Offspring are encoded by their ancestry, i.e. parent ids, breeding seed and child number, since breeding
+        # with a seeded rng determines the crossover points and every mutation. A genome bred more than
+        # materialize_interval generations after its nearest materialized ancestor is materialized itself,
+        # which bounds the number of genomes to breed when rebuilding. Materialized genomes are kept as their
+        # specimens, whose weights are only flattened when encoded for a receiver that does not hold them.
+        self.materialize_interval = materialize_interval
+        self._ancestry: Dict[str,Ancestry] = {}
+        self._depths: Dict[str,int] = {}
+        self._materialized: Dict[str,"Specimen[G]"] = {}
+
+    def record(self, specimen: "Specimen[G]") -> None:
+        if specimen.id in self._depths:
+            return
+
+        ancestry = specimen.ancestry
+        if ancestry is not None and all(parent in self._depths for parent in ancestry.parents):
+            depth = 1 + max(self._depths[parent] for parent in ancestry.parents)
+            if depth <= self.materialize_interval:
+                self._ancestry[specimen.id] = ancestry
+                self._depths[specimen.id] = depth
+                return
+
+        self._materialized[specimen.id] = specimen
+        self._depths[specimen.id] = 0
+
+    def encode(self,
+               genome_id:   str,
+               held:        Container[str] = ()) -> SeedChain:
+        # Parents come before their offspring, and the search stops at held and materialized genomes.
+        dependencies: List[str] = []
+        materialized: Dict[str,_Weights] = {}
+        records: List[Tuple[str,Ancestry]] = []
+        visited: Set[str] = set()
+
+        def visit(genome_id: str) -> None:
+            if genome_id in visited:
+                return
+            visited.add(genome_id)
+
+            if genome_id in held:
+                dependencies.append(genome_id)
+            elif genome_id in self._materialized:
+                with self._materialized[genome_id] as genome:
+                    materialized[genome_id] = genome.flatten(), genome.mutation_rates()
+            else:
+                ancestry = self._ancestry[genome_id]
+                for parent in ancestry.parents:
+                    visit(parent)
+                records.append((genome_id, ancestry))
+
+        visit(genome_id)
+        return SeedChain(tuple(dependencies), materialized, tuple(records))
+
+    def decode(self,
+               genome_id:   str,
+               template:    G) -> G:
+        return rebuild(template, {}, self.encode(genome_id))[genome_id]
+
+    def prune(self, keep: Iterable[str]) -> None:
+        # Forgets every genome that none of keep descends from.
+        reachable: Set[str] = set()
+        pending = [genome_id for genome_id in keep if genome_id in self._depths]
+        while pending:
+            genome_id = pending.pop()
+            if genome_id in reachable:
+                continue
+            reachable.add(genome_id)
+            if genome_id in self._ancestry:
+                pending.extend(self._ancestry[genome_id].parents)
+
+        for table in (self._ancestry, self._depths, self._materialized):
+            for genome_id in [genome_id for genome_id in table if genome_id not in reachable]:
+                del table[genome_id]
+
+    def materialized(self) -> int:
+        return len(self._materialized)
+
+    def __contains__(self, genome_id: str) -> bool:
+        return genome_id in self._depths
+
+    def __len__(self) -> int:
+        return len(self._depths)
+
+
+def rebuild(template:       G,
+            dependencies:   Mapping[str,G],
+            chain:          SeedChain) -> Dict[str,G]:
+    # Returns the materialized and bred genomes of the chain, in its order. Siblings are bred only once.
+    genomes: Dict[str,G] = {}
+    for genome_id,(weights,mutation_rates) in chain.materialized.items():
+        genome = template.view(np.array(weights, dtype=np.float32))
+        genome.set_mutation_rates(mutation_rates)
+        genomes[genome_id] = genome
+
+    def lookup(genome_id: str) -> G:
+        return genomes[genome_id] if genome_id in genomes else dependencies[genome_id]
+
+    offspring: Dict[Tuple[Any,...],Tuple[G,G]] = {}
+    for genome_id,ancestry in chain.records:
+        key = (ancestry.parents, ancestry.seed.entropy, ancestry.seed.spawn_key)
+        if key not in offspring:
+            parent1, parent2 = ancestry.parents
+            offspring[key] = lookup(parent1).breed(lookup(parent2), rng=np.random.default_rng(ancestry.seed))
+        genomes[genome_id] = offspring[key][ancestry.child]
+
+    return genomes
@@ -1,23 +1,38 @@
 from typing import *
 from dataclasses import dataclass
 from tqdm import tqdm
+from numpy.typing import NDArray
 
 import multiprocessing as mp
+import concurrent.futures
+import collections
+import contextlib
+import functools
+import itertools
 import random
 import os
+import queue
 import pickle
+import shutil
+import json
 import copy
 import torch
+import numpy as np
 
 from ...util import maybe as mb
-from ...agents import Specimen, Fitness
+from ...agents import Specimen, Fitness, Race, Breeder, Checkpoint, GenomeStore, GenomeBatch, EvaluationCache
+from .checkpoint import CheckpointDataType
+from .specimen import Ancestry
+from . import selection
+from ...games import VectorEnvironment
 
 if TYPE_CHECKING:
     from numpy import generic
     from ...games import Observation, Action, Reward, Environment
-    from ...agents import Genome, Policy, AgentResult
+    from ...agents import Genome, Policy, AgentResult, Coordinator
     
 
+T = TypeVar("T")
 G = TypeVar("G", bound="""Genome[
             Environment[Observation[generic],Action,Reward[Observation[generic],Action]],
             Observation[generic],
@@ -61,36 +76,178 @@ class Population(Generic[G]):
                roulette_parents: int,
                random_parents: int = 0,
                dirname: str|None = None,
-               number_of_process: int = 4) -> "Population[G]":
+               number_of_process: int = 4,
+               shared_memory: bool = False,
+               batch_size: int = 1,
+               decision_interval: int = 1,
+               max_time_steps: int = 10_000,
+               racing: bool = False,
+               race_interval: int = 100,
+               cache: EvaluationCache[G]|None = None,
+               snapshot_interval: int = 10,
+               start_generation: int = 0,
+               coordinator: "Coordinator[G]|None" = None) -> "Population[G]":
         
         # Necessary for multiprocessing to work, or else the program will deadlock.
         torch.set_num_threads(1)
 
         number_of_parents = elite_parents + roulette_parents + random_parents
         assert number_of_parents > 2, "Population must have at least 2 parents."
+        assert coordinator is None or not (shared_memory or racing), "Remote workers share neither the genome store nor the race."
+
+        save_dir = _checkpoint_dir(dirname)
+
+        # Everything but the population and the cache that is needed to resume, see Population.resume.
+        config = dict(
+            number_of_generations=number_of_generations,
+            survivor_cnt=survivor_cnt,
+            elite_parents=elite_parents,
+            roulette_parents=roulette_parents,
+            random_parents=random_parents,
+            number_of_process=number_of_process,
+            shared_memory=shared_memory,
+            batch_size=batch_size,
+            decision_interval=decision_interval,
+            max_time_steps=max_time_steps,
+            racing=racing,
+            race_interval=race_interval,
+            snapshot_interval=snapshot_interval
+        )
 
-        save_dir: str|None = None
-
-        if dirname:
-            save_dir = os.path.join("checkpoints", dirname)
-            for directory in ["checkpoints", save_dir]:
-                try:
-                    os.mkdir(directory)
-                except FileExistsError:
-                    continue
-
-        def genomes(text: str|None = None) -> Generator[G,None,None]:
-            with tqdm(total=self.size(), desc=text, disable=text is None) as bar:
-                for specimen in self:
-                    with specimen as genome:
-                        yield genome
-                    bar.update()
+        # Episodes whose rewards rank behind those of the number_of_parents-th best finished episode at a checkpoint are aborted.
+        race = Race(contenders=number_of_parents, max_time_steps=max_time_steps, interval=race_interval) if racing else None
+        settings = dict(decision_interval=decision_interval, max_time_steps=max_time_steps)
+
+        # Content keys of the specimens, which never change, so survivors are not hashed again.
+        keys: Dict[Specimen[G],str] = {}
+
+        # The parents of the current generation by id.
+        sources: Dict[str,Specimen[G]] = {}
+
+        with contextlib.ExitStack() as stack:
+            store: GenomeStore[G]|None = None
+            if shared_memory:
+                # The second half holds the offspring, which are bred in place by the workers.
+                with next(iter(self)) as template:
+                    store = stack.enter_context(GenomeStore(template=template, capacity=2*self.size() + 1))
+
+            def evaluate(pool:      "mp.pool.Pool", 
+                         specimens: Sequence[Specimen[G]], 
+                         text:      str,
+                         snapshot:  "_Snapshot|None" = None) -> Tuple["AgentResult",...]:
+                results: List["AgentResult|None"] = [None]*len(specimens)
+
+                def cached(index: int, genome: G|None = None) -> bool:
+                    if cache is None:
+                        return False
+                    if specimens[index] not in keys:
+                        if genome is None:
+                            return False
+                        keys[specimens[index]] = cache.key(genome, **settings)
+                    results[index] = cache.get(keys[specimens[index]])
+                    return results[index] is not None
+
+                def genomes() -> Generator[Tuple[int,G],None,None]:
+                    # Every specimen is loaded once. Those with cached results are not dispatched,
+                    # but still written to the store, which the offspring are bred from.
+                    for index,specimen in enumerate(specimens):
+                        if store is None and snapshot is None and cached(index):
+                            bar.update()
+                            continue
+                        with specimen as genome:
+                            if store is not None:
+                                store.write(index, genome)
+                            if snapshot is not None:
+                                snapshot.capture(index, genome)
+                            if cached(index, genome):
+                                bar.update()
+                                continue
+                            yield index, genome
+
+                # Unordered, so that the race bound is updated as soon as any episode finishes.
+                with tqdm(total=len(specimens), desc=text) as bar:
+                    if coordinator is not None:
+                        # Offspring may be bred by the remote workers from the parents of the previous generation.
+                        for index,result in coordinator.evaluate(
+                            tasks=((index, specimens[index], genome) for index,genome in genomes()), 
+                            settings=settings, 
+                            sources=sources
+                        ):
+                            results[index] = result if cache is None else cache.record(keys[specimens[index]], result)
+                            bar.update()
+                        return tuple(cast(List["AgentResult"], results))
+
+                    if store is None:
+                        blocks = pool.imap_unordered(
+                            functools.partial(_call_indexed, functools.partial(_call_genomes, **settings)), 
+                            (tuple(zip(*block)) for block in _batched(genomes(), batch_size))
+                        )
+                    else:
+                        blocks = pool.imap_unordered(
+                            functools.partial(_call_indexed, functools.partial(_call_indices, **settings)), 
+                            ((indices, indices) for indices in _batched((index for index,_ in genomes()), batch_size))
+                        )
+
+                    for indices,block in blocks:
+                        for index,result in zip(indices, block, strict=True):
+                            if race is not None:
+                                race.record(result)
+                            # Repeated evaluations of the same genome are aggregated.
+                            results[index] = result if cache is None else cache.record(keys[specimens[index]], result)
+                        bar.update(len(block))
+
+                return tuple(cast(List["AgentResult"], results))
+
+            # With a coordinator, the local pool only breeds.
+            pool = stack.enter_context(mp.Pool(
+                processes=number_of_process,
+                initializer=_attach_worker,
+                initargs=(store, race)
+            ))
+            if coordinator is not None:
+                stack.enter_context(coordinator)
+
+            # Snapshots are written by a background thread, so the next generation does not wait for the disk.
+            writer = stack.enter_context(concurrent.futures.ThreadPoolExecutor(max_workers=1))
+            written: "concurrent.futures.Future[None]|None" = None
+
+            for generation in range(start_generation, number_of_generations):
+                if race is not None:
+                    race.reset()
+
+                specimens = tuple(self)
+                for specimen in keys.keys() - set(specimens):
+                    del keys[specimen]
+
+                # The population is captured as it is evaluated, together with the RNG state it was bred up to.
+                snapshot: _Snapshot|None = None
+                if save_dir and snapshot_interval > 0 and generation > start_generation and generation % snapshot_interval == 0:
+                    if written is not None:
+                        written.result()
+                    snapshot = _Snapshot(cast(str, save_dir), writer=writer, state=dict(
+                        generation=generation,
+                        in_memory=self.in_memory,
+                        random_state=_random_state(),
+                        evolve=config
+                    ))
+
+                results = evaluate(pool, specimens, f"Generation {generation}/{number_of_generations}", snapshot)
+
+                if snapshot is not None:
+                    written = snapshot.finish()
 
-        with mp.Pool(processes=number_of_process) as pool:        
-            for generation in range(number_of_generations):
-                results = tuple(pool.imap(_call_genome, genomes(f"Generation {generation}/{number_of_generations}")))
+                fitnesses = Fitness.normalize_all(
+                    (result["fitness"] for result in results),
+                    disqualified=(result["aborted"] for result in results)
+                )
 
-                fitnesses = Fitness.normalize_all(result["fitness"] for result in results)
+                report = Race.report(results) if race is not None else None
+                if report is not None:
+                    print(
+                        f"Race: aborted {report['aborted_episodes']}/{len(results)} episodes, "
+                        f"saved ~{report['steps_saved']:.0f} of {report['steps_played'] + report['steps_saved']:.0f} steps "
+                        f"({100*report['saved_fraction']:.1f}%)."
+                    )
 
                 game_rewards = tuple(result["game_reward"] for result in results)
                 max_game_reward = max(game_rewards)
@@ -102,7 +259,7 @@ class Population(Generic[G]):
                 min_steps_played = min(steps_played)
                 avg_steps_played = sum(steps_played)/len(steps_played)
                 
-                for specimen,fitness in zip(self,fitnesses):
+                for specimen,fitness in zip(specimens,fitnesses):
                     rank = fitness.rank()
                     specimen.rank = rank
 
@@ -121,15 +278,19 @@ class Population(Generic[G]):
                         game_rewards=game_rewards,
                         max_game_reward=max_game_reward,
                         min_game_reward=min_game_reward,
-                        avg_game_reward=avg_game_reward
+                        avg_game_reward=avg_game_reward,
+
+                        race_report=report,
+                        evaluation=None if cache is None else cache.statistics(keys[specimen])
                         ))
 
                 self._log_generation()
 
                 if save_dir:
                     self.save_fittest(
-                        path=os.path.join(save_dir, f"gen{generation}"),
-                        verbose=False
+                        path=os.path.join(save_dir, "fittest"),
+                        verbose=False,
+                        label=f"gen{generation}"
                         )
 
                 survivors = self.elitism_selection(survivor_cnt)
@@ -141,12 +302,139 @@ class Population(Generic[G]):
                 
                 old_size = self.size()
                 
-                offsprings = parents.populate(self.size() - survivors.size())
+                if store is None:
+                    offsprings = parents.populate(self.size() - survivors.size(), pool=pool)
+                else:
+                    offsprings = parents._populate_in_store(
+                        num_of_descendants=self.size() - survivors.size(),
+                        pool=pool,
+                        store=store,
+                        indices={specimen: index for index,specimen in enumerate(specimens)},
+                        offset=self.size()
+                    )
                 self = survivors + offsprings
                 assert self.size() == old_size, f"Mismatch between {old_size=} and new_size={self.size()}"
+                sources = {specimen.id: specimen for specimen in parents}
+
+            if written is not None:
+                written.result()
                 
         return self
 
+    @staticmethod
+    def resume(dirname: str, **overrides: Any) -> "Population[G]":
+        # Continues Population.evolve from the latest snapshot in checkpoints/dirname with the same
+        # configuration, of which any argument of evolve can be overridden, e.g. cache or number_of_generations.
+        path = _latest_snapshot(os.path.join("checkpoints", dirname))
+        if path is None:
+            raise FileNotFoundError(f"Found no population snapshot to resume in checkpoints/{dirname}.")
+
+        state = cast(Dict[str,Any], Checkpoint(path).state())
+        population: Population[G] = Population.load_checkpoint(path, in_memory=state["in_memory"])
+        random.setstate(_from_random_state(state["random_state"]))
+
+        print(f"Resuming {dirname} from generation {state['generation']}.")
+        return population.evolve(**dict(state["evolve"], dirname=dirname, start_generation=state["generation"], **overrides))
+
+    @staticmethod
+    def latest_snapshot(dirname: str) -> str|None:
+        return _latest_snapshot(os.path.join("checkpoints", dirname))
+    
+    def evolve_steady_state(self,
+                            number_of_evaluations: int,
+                            elite_parents: int,
+                            roulette_parents: int,
+                            random_parents: int = 0,
+                            dirname: str|None = None,
+                            number_of_process: int = 4,
+                            decision_interval: int = 1) -> "Population[G]":
+        
+        # Instead of generations, every finished evaluation replaces the worst specimen, and offspring are
+        # bred and dispatched as soon as a worker runs low on work, so no worker waits for the longest episode.
+        torch.set_num_threads(1)
+
+        number_of_parents = elite_parents + roulette_parents + random_parents
+        assert number_of_parents > 2, "Population must have at least 2 parents."
+        assert number_of_evaluations >= self.size(), "Every specimen must be evaluated at least once."
+
+        save_dir = _checkpoint_dir(dirname)
+        size = self.size()
+        in_flight = 2*number_of_process
+
+        finished: "queue.Queue[Tuple[Specimen[G],AgentResult|BaseException]]" = queue.Queue()
+        results: Dict[Specimen[G],"AgentResult"] = {}
+        play = functools.partial(_call_genome, decision_interval=decision_interval)
+
+        def ranked() -> "Population[G]":
+            population = self._new_population(results)
+            fitnesses = Fitness.normalize_all(results[specimen]["fitness"] for specimen in population)
+            for specimen,fitness in zip(population, fitnesses):
+                specimen.rank = fitness.rank()
+                specimen.stats.update(dict(
+                    fitness=fitness,
+                    rank=specimen.rank,
+                    steps_played=results[specimen]["steps_played"],
+                    game_reward=results[specimen]["game_reward"]
+                ))
+            return population
+
+        with mp.Pool(processes=number_of_process) as pool:
+
+            def dispatch(specimen: Specimen[G]) -> None:
+                with specimen as genome:
+                    pool.apply_async(
+                        play, 
+                        (genome,), 
+                        callback=lambda result: finished.put((specimen, result)),
+                        error_callback=lambda error: finished.put((specimen, error))
+                    )
+
+            for specimen in self:
+                dispatch(specimen)
+
+            dispatched = pending = size
+            evaluations = 0
+            population = self.cleared()
+
+            with tqdm(total=number_of_evaluations, desc="Evaluations") as bar:
+                while pending > 0:
+                    specimen, result = finished.get()
+                    pending -= 1
+                    if isinstance(result, BaseException):
+                        raise result
+                    
+                    results[specimen] = result
+                    evaluations += 1
+                    bar.update()
+
+                    population = ranked()
+                    if population.size() > size:
+                        worst = population.sorted(descending=False)[0]
+                        del results[worst]
+                        population = ranked()
+
+                    if evaluations % size == 0:
+                        population._log_generation()
+                        if save_dir:
+                            population.save_fittest(
+                                path=os.path.join(save_dir, "fittest"),
+                                verbose=False,
+                                label=f"gen{evaluations//size - 1}"
+                            )
+                    
+                    while pending < in_flight and dispatched < number_of_evaluations and population.size() >= number_of_parents:
+                        parents = population.selection(
+                            elites=elite_parents,
+                            roulettes=roulette_parents,
+                            randoms=random_parents
+                        )
+                        for offspring in parents.populate(min(2, number_of_evaluations - dispatched), silent=True):
+                            dispatch(offspring)
+                            dispatched += 1
+                            pending += 1
+
+        return population
+
     def size(self) -> int:
         return len(self.specimens)
     
@@ -156,36 +444,86 @@ class Population(Generic[G]):
         weight = weight if weight else lambda specimen: specimen.rank
         return sorted(self.specimens, key=weight, reverse=descending)
 
-    def populate(self, num_of_descendants: int) -> "Population[G]":
+    def populate(self, 
+                 num_of_descendants:    int,
+                 pool:                  "mp.pool.Pool|None" = None,
+                 seed:                  int|None = None,
+                 silent:                bool = False) -> "Population[G]":
+        
+        pairs = self._pairs(num_of_descendants)
+        seeds = _pair_seeds(seed, len(pairs))
 
-        if num_of_descendants % 2 == 0:
-            num_of_parents = num_of_descendants
-        else:
-            num_of_parents = num_of_descendants + 1
+        def genome_pairs() -> Generator[Tuple[G,G,np.random.SeedSequence],None,None]:
+            for (specimen1,specimen2),pair_seed in zip(pairs, seeds):
+                with specimen1 as parent1, specimen2 as parent2:
+                    yield parent1, parent2, pair_seed
 
-        parents = random.choices(population=tuple(self.specimens), k=num_of_parents)
         offsprings: List[Specimen[G]] = []
-        with tqdm(total=num_of_parents, desc=f"Breeding new generation.") as bar:
-            for specimen1,specimen2 in zip(parents[:num_of_parents//2], parents[num_of_parents//2:]):
-                with specimen1 as parent1, specimen2 as parent2:
-                    child1,child2 = parent1.breed(parent2)
-                    offsprings += [
-                        Specimen(genome=child1, in_memory=self.in_memory),
-                        Specimen(genome=child2, in_memory=self.in_memory)
-                        ]
+        with tqdm(total=2*len(pairs), desc=f"Breeding new generation.", disable=silent) as bar:
+            children = map(_breed_genomes, genome_pairs()) if pool is None else pool.imap(_breed_genomes, genome_pairs())
+            for (child1,child2),(specimen1,specimen2),pair_seed in zip(children, pairs, seeds):
+                parent_ids = (specimen1.id, specimen2.id)
+                offsprings += [
+                    Specimen(genome=child1, in_memory=self.in_memory, ancestry=Ancestry(parent_ids, pair_seed, 0)),
+                    Specimen(genome=child2, in_memory=self.in_memory, ancestry=Ancestry(parent_ids, pair_seed, 1))
+                    ]
                 bar.update(2)
 
         return self._new_population(
             specimens=offsprings[:num_of_descendants]
         )
+    
+    def _populate_in_store(self,
+                           num_of_descendants:  int,
+                           pool:                "mp.pool.Pool",
+                           store:               GenomeStore[G],
+                           indices:             Dict[Specimen[G],int],
+                           offset:              int,
+                           seed:                int|None = None) -> "Population[G]":
+        # The parents already reside in the store, so only indices are sent to the workers,
+        # which write the children into the rows following offset.
+        pairs = self._pairs(num_of_descendants)
+        seeds = _pair_seeds(seed, len(pairs))
+        assert offset + 2*len(pairs) <= len(store), "The store cannot hold every offspring."
+
+        tasks = [
+            (indices[specimen1], indices[specimen2], offset + 2*i, pair_seed) 
+            for i,((specimen1,specimen2),pair_seed) in enumerate(zip(pairs, seeds))
+        ]
+
+        with tqdm(total=2*len(pairs), desc=f"Breeding new generation.") as bar:
+            for _ in pool.imap(_breed_indices, tasks):
+                bar.update(2)
+
+        return self._new_population(
+            specimens=(
+                Specimen(
+                    genome=store.copy(offset + i), 
+                    in_memory=self.in_memory, 
+                    ancestry=Ancestry((pairs[i//2][0].id, pairs[i//2][1].id), seeds[i//2], i % 2)
+                ) 
+                for i in range(num_of_descendants)
+            )
+        )
+    
+    def _pairs(self, num_of_descendants: int) -> List[Tuple[Specimen[G],Specimen[G]]]:
+        if num_of_descendants % 2 == 0:
+            num_of_parents = num_of_descendants
+        else:
+            num_of_parents = num_of_descendants + 1
+
+        parents = random.choices(population=tuple(self.specimens), k=num_of_parents)
+        return list(zip(parents[:num_of_parents//2], parents[num_of_parents//2:]))
 
     def selection(self, 
                   elites: int = 0, 
                   roulettes: int = 0, 
-                  randoms: int = 0) -> "Population[G]":
+                  randoms: int = 0,
+                  tournaments: int = 0) -> "Population[G]":
         return self.elitism_selection(elites) +\
                     self.roulette_selection(roulettes) +\
-                    self.random_selection(randoms)
+                    self.random_selection(randoms) +\
+                    self.tournament_selection(tournaments)
     
     def random_selection(self, 
                          count:     int,
@@ -196,24 +534,15 @@ class Population(Generic[G]):
         
         assert count <= self.size()
         
+        specimens = tuple(self)
         if weight is None:
-            weight = lambda _: 1.0
-
-        specimens = [specimen for specimen in self]
-        weights = [weight(specimen) for specimen in specimens]
-
-        if sum(weights) <= 0:
-            weights = [1]*len(weights)
-
-        selections: List[Specimen[G]] = []
+            weights = np.ones(len(specimens))
+        else:
+            weights = np.fromiter((weight(specimen) for specimen in specimens), dtype=np.float64, count=len(specimens))
 
-        while len(selections) < count:
-            indices = range(len(specimens))
-            choice = random.choices(indices,weights=weights)[0]
-            selections.append(specimens.pop(choice))
-            weights.pop(choice)
-        
-        return self._new_population(specimens=selections)
+        return self._new_population(
+            specimens=(specimens[i] for i in selection.weighted_sample(weights, count, rng=_rng()))
+        )
     
     def elitism_selection(self, 
                           count:    int,
@@ -221,8 +550,12 @@ class Population(Generic[G]):
         if count < 1:
             return self.cleared()
         
+        specimens = tuple(self)
+        weight = weight if weight else lambda specimen: specimen.rank
+        weights = np.fromiter((weight(specimen) for specimen in specimens), dtype=np.float64, count=len(specimens))
+        
         return self._new_population(
-            specimens=self.sorted(weight=weight)[:count]
+            specimens=(specimens[i] for i in selection.truncation(weights, count))
         )
 
     def roulette_selection(self, count: int) -> "Population[G]":
@@ -231,6 +564,17 @@ class Population(Generic[G]):
         
         return self.random_selection(count=count, weight=lambda specimen: specimen.rank)
     
+    def tournament_selection(self, 
+                             count:             int,
+                             tournament_size:   int = 2) -> "Population[G]":
+        if count < 1:
+            return self.cleared()
+        
+        specimens = tuple(self)
+        return self._new_population(
+            specimens=(specimens[i] for i in selection.tournament(self._ranks(specimens), count, size=tournament_size, rng=_rng()))
+        )
+    
     def clone(self) -> "Population[G]":
         return copy.deepcopy(self)
     
@@ -242,12 +586,36 @@ class Population(Generic[G]):
 
     def save_fittest(self, 
                      path: str,
-                     verbose: bool = True) -> None:
+                     verbose: bool = True,
+                     label: str|None = None,
+                     dtype: CheckpointDataType = "float32") -> None:
+        # Appends a row to the checkpoint at path, so saving every generation does not pickle whole genomes.
         fittest = self.sorted(descending=True)[0]
         with fittest as genome:
-            genome.save(path)
+            index = genome.save_checkpoint(path, dtype=dtype, label=label, rank=fittest.rank)
             if verbose:
-                print(f"Saved {fittest=} to {path=}")    
+                print(f"Saved {fittest=} to {path=} as row {index}")    
+
+    def save_checkpoint(self, 
+                        path: str,
+                        dtype: CheckpointDataType = "float32") -> None:
+        # Every specimen becomes a row of a new checkpoint, without the stats.
+        checkpoint: Checkpoint[G]|None = None
+        for specimen in self.sorted(descending=True):
+            with specimen as genome:
+                if checkpoint is None:
+                    checkpoint = Checkpoint.create(path, genome, dtype=dtype)
+                checkpoint.append(genome, rank=specimen.rank)
+
+    @staticmethod
+    def load_checkpoint(path: str, in_memory: bool = False) -> "Population[G]":
+        checkpoint: Checkpoint[G] = Checkpoint(path)
+        specimens: List[Specimen[G]] = []
+        for index,genome in enumerate(checkpoint.genomes()):
+            specimen = Specimen(genome=genome, in_memory=in_memory)
+            specimen.rank = float(checkpoint.meta(index).get("rank", 0.0))
+            specimens.append(specimen)
+        return Population(specimens=frozenset(specimens), in_memory=in_memory)
 
     def cleared(self) -> "Population[G]":
         return self._new_population(specimens=tuple())
@@ -285,19 +653,197 @@ class Population(Generic[G]):
     def __iter__(self) -> Iterator[Specimen[G]]:
         return iter(self.specimens)
     
+    def _ranks(self, specimens: Sequence[Specimen[G]]) -> NDArray[np.float64]:
+        return np.fromiter((specimen.rank for specimen in specimens), dtype=np.float64, count=len(specimens))
+
     def _log_generation(self) -> None:
-        ranked = self.sorted()
-        if len(ranked) > 0:
-            best = ranked[0].rank
-            worst = ranked[-1].rank
-            mean_fitness = sum(genome.rank for genome in ranked)/len(ranked)
+        if self.size() > 0:
+            ranks = self._ranks(tuple(self))
+            best = float(ranks.max())
+            worst = float(ranks.min())
+            mean_fitness = float(ranks.mean())
             print(f"{best=}, {worst=}, {mean_fitness=}")
 
 
-def _call_genome(genome: G) -> "AgentResult":
+def _rng() -> np.random.Generator:
+    # Seeded from random, so that seeding random keeps the selections reproducible.
+    return np.random.default_rng(random.getrandbits(64))
+
+def _checkpoint_dir(dirname: str|None) -> str|None:
+    if not dirname:
+        return None
+    
+    save_dir = os.path.join("checkpoints", dirname)
+    for directory in ["checkpoints", save_dir]:
+        try:
+            os.mkdir(directory)
+        except FileExistsError:
+            continue
+    return save_dir
+
+class _Snapshot:
+
+    def __init__(self,
+                 save_dir:  str,
+                 state:     Dict[str,Any],
+                 writer:    concurrent.futures.ThreadPoolExecutor) -> None:
+        super().__init__()
+        # Captured genomes are written in chunks of rows by the writer thread while the generation is evaluated,
+        # so at most a few chunks, rather than the whole population, are held in memory.
+        self.save_dir = save_dir
+        self.state = state
+        self.name = f"population_gen{state['generation']}"
+        self._writer = writer
+        self._checkpoint: Checkpoint[Any]|None = None
+        self._captured = 0
+        self._rows: NDArray[np.float32]|None = None
+        self._meta: List[Dict[str,Any]] = []
+        self._pending: Deque["concurrent.futures.Future[None]"] = collections.deque()
+        self._written: List["concurrent.futures.Future[None]"] = []
+
+    def capture(self, index: int, genome: G) -> None:
+        assert index == self._captured, "Genomes must be captured in the order of the population."
+        if self._checkpoint is None:
+            path = os.path.join(self.save_dir, self.name)
+            shutil.rmtree(path, ignore_errors=True)
+            self._checkpoint = Checkpoint.create(path, genome, state=self.state)
+
+        if self._rows is None:
+            self._rows = np.empty((max(1, _SNAPSHOT_CHUNK//(4*genome.numel())), genome.numel()), dtype=np.float32)
+        genome.flatten(out=self._rows[len(self._meta)])
+        self._meta.append(dict(mutation_rates=list(genome.mutation_rates())))
+        self._captured += 1
+
+        if len(self._meta) == len(self._rows):
+            self._flush()
+
+    def finish(self) -> "concurrent.futures.Future[None]":
+        # The new snapshot is complete before the pointer moves to it, and only then is the previous one removed.
+        assert self._checkpoint is not None, "No genome was captured."
+        self._flush()
+        return self._writer.submit(self._publish)
+
+    def _flush(self) -> None:
+        if self._rows is None or not self._meta:
+            return
+
+        # Waits for the oldest chunk, so that no more than two are queued behind the one being written.
+        while len(self._pending) > 1:
+            self._pending.popleft().result()
+
+        future = self._writer.submit(cast(Checkpoint[Any], self._checkpoint).extend, self._rows[:len(self._meta)], self._meta)
+        self._pending.append(future)
+        self._written.append(future)
+        self._rows = None
+        self._meta = []
+
+    def _publish(self) -> None:
+        # Runs on the writer thread after every chunk, which raises here if any of them failed.
+        for future in self._written:
+            future.result()
+
+        temporary = os.path.join(self.save_dir, f"{_SNAPSHOT_POINTER}.tmp")
+        with open(temporary, "w") as file:
+            json.dump({"snapshot": self.name}, file)
+        os.replace(temporary, os.path.join(self.save_dir, _SNAPSHOT_POINTER))
+
+        for entry in os.listdir(self.save_dir):
+            if entry.startswith("population_gen") and entry != self.name:
+                shutil.rmtree(os.path.join(self.save_dir, entry), ignore_errors=True)
+
+# Bytes of flat weights per chunk of a snapshot.
+_SNAPSHOT_CHUNK = 64*2**20
+
+_SNAPSHOT_POINTER = "snapshot.json"
+
+def _latest_snapshot(save_dir: str) -> str|None:
+    try:
+        with open(os.path.join(save_dir, _SNAPSHOT_POINTER), "r") as file:
+            path = os.path.join(save_dir, json.load(file)["snapshot"])
+    except FileNotFoundError:
+        return None
+    return path if Checkpoint.is_checkpoint(path) else None
+
+def _random_state() -> List[Any]:
+    version, internal, gauss = random.getstate()
+    return [version, list(internal), gauss]
+
+def _from_random_state(state: List[Any]) -> Tuple[Any,...]:
+    version, internal, gauss = state
+    return version, tuple(internal), gauss
+
+def _attach_worker(store: GenomeStore[G]|None, race: Race|None) -> None:
+    if store is not None:
+        _attach_store(store)
+    globals()["race"] = race
+
+def _attach_store(store: GenomeStore[G]) -> None:
+    globals()["store"] = store
+    globals()["breeder"] = Breeder(store.view(0))
+
+def _call_indexed(call: Callable[[T],"Tuple[AgentResult,...]"], task: Tuple[Sequence[int],T]) -> Tuple[Sequence[int],Tuple["AgentResult",...]]:
+    index, payload = task
+    return index, call(payload)
+
+def _call_indices(indices: Sequence[int], decision_interval: int = 1, max_time_steps: int = 10_000) -> Tuple["AgentResult",...]:
+    store: GenomeStore[G] = globals()["store"]
+    return _call_genomes(tuple(store.view(index) for index in indices), decision_interval=decision_interval, max_time_steps=max_time_steps)
+
+def _call_genomes(genomes: Sequence[G], decision_interval: int = 1, max_time_steps: int = 10_000) -> Tuple["AgentResult",...]:
+    if len(genomes) == 1:
+        return (_call_genome(genomes[0], decision_interval=decision_interval, max_time_steps=max_time_steps),)
+    
+    if "envs" not in globals():
+        globals()["envs"] = []
+    envs: List[Any] = globals()["envs"]
+    while len(envs) < len(genomes):
+        envs.append(genomes[0].create_environment())
+
+    return GenomeBatch(genomes).play(
+        envs=VectorEnvironment(envs[:len(genomes)]),
+        max_time_steps=max_time_steps,
+        respawn=False,
+        stochastic=True,
+        decision_interval=decision_interval,
+        race=globals().get("race"))
+
+def _call_genome(genome: G, decision_interval: int = 1, max_time_steps: int = 10_000) -> "AgentResult":
     if "env" not in globals():
         globals()["env"] = genome.create_environment()
     return genome.play(
         env=globals()["env"], 
+        max_time_steps=max_time_steps,
         respawn=False, 
-        stochastic=True)    
+        stochastic=True,
+        decision_interval=decision_interval,
+        race=globals().get("race"))
+
+def _breed_genomes(pair: Tuple[G,G,np.random.SeedSequence]) -> Tuple[G,G]:
+    parent1, parent2, seed = pair
+    return parent1.breed(parent2, rng=np.random.default_rng(seed))
+
+def _breed_indices(task: Tuple[int,int,int,np.random.SeedSequence]) -> None:
+    store: GenomeStore[G] = globals()["store"]
+    breeder: Breeder[G] = globals()["breeder"]
+    parent1, parent2, child1, seed = task
+    breeder.breed(
+        parent1=store.weights(parent1),
+        parent2=store.weights(parent2),
+        rates1=store.rates(parent1),
+        rates2=store.rates(parent2),
+        child1=store.weights(child1),
+        child2=store.weights(child1 + 1),
+        rng=np.random.default_rng(seed)
+    )
+    store.rates(child1)[:] = store.rates(parent1)
+    store.rates(child1 + 1)[:] = store.rates(parent2)
+
+def _pair_seeds(seed: int|None, count: int) -> List[np.random.SeedSequence]:
+    # Every pair gets a seed of its own, so that the offspring do not depend on which worker breeds them.
+    return np.random.SeedSequence(random.getrandbits(64) if seed is None else seed).spawn(count)
+
+def _batched(iterable: Iterable[T], size: int) -> Generator[Tuple[T,...],None,None]:
+    assert size > 0, "Batch size must be positive."
+    iterator = iter(iterable)
+    while batch := tuple(itertools.islice(iterator, size)):
+        yield batch
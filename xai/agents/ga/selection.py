@@ -0,0 +1,58 @@
+from typing import *
+from numpy.typing import NDArray
+
+import numpy as np
+
+def weighted_sample(weights:    NDArray[np.float64],
+                    count:      int,
+                    rng:        np.random.Generator|None = None) -> NDArray[np.int64]:
+    # Weighted sampling without replacement (Efraimidis-Spirakis): every index gets the key log(u)/w,
+    # and the largest keys win, in O(n) instead of a draw and a list removal per selection.
+    # Indices without positive weight are only selected, uniformly, when the positive ones run out.
+    rng = rng if rng else np.random.default_rng()
+    weights = np.asarray(weights, dtype=np.float64)
+    assert 0 <= count <= weights.size, f"Cannot select {count} out of {weights.size}."
+
+    positive = np.flatnonzero(weights > 0)
+    if count >= positive.size:
+        rest = np.flatnonzero(~(weights > 0))
+        return np.concatenate((
+            rng.permutation(positive),
+            rng.choice(rest, size=count - positive.size, replace=False)
+        ))
+
+    keys = np.log(rng.random(positive.size))/weights[positive]
+    winners = np.argpartition(keys, -count)[-count:]
+    return positive[winners[np.argsort(keys[winners])[::-1]]]
+
+def truncation(ranks: NDArray[np.float64], count: int) -> NDArray[np.int64]:
+    # The count best indices in descending order, using a partial sort.
+    ranks = np.asarray(ranks, dtype=np.float64)
+    count = min(count, ranks.size)
+    if count < 1:
+        return np.empty(0, dtype=np.int64)
+
+    best = np.argpartition(ranks, -count)[-count:]
+    return best[np.argsort(ranks[best], kind="stable")[::-1]]
+
+def tournament(ranks:   NDArray[np.float64],
+               count:   int,
+               size:    int = 2,
+               rng:     np.random.Generator|None = None) -> NDArray[np.int64]:
+    # Tournaments without replacement of the winners. Every round holds all the missing tournaments at once
+    # among the indices that have not won yet.
+    rng = rng if rng else np.random.default_rng()
+    ranks = np.asarray(ranks, dtype=np.float64)
+    assert 0 <= count <= ranks.size, f"Cannot select {count} out of {ranks.size}."
+    assert size > 0, "A tournament must have at least one contestant."
+
+    winners = np.empty(0, dtype=np.int64)
+    remaining = np.arange(ranks.size)
+    while winners.size < count:
+        contestants = remaining[rng.integers(0, remaining.size, size=(count - winners.size, min(size, remaining.size)))]
+        round_winners = contestants[np.arange(contestants.shape[0]), np.argmax(ranks[contestants], axis=1)]
+        round_winners = np.unique(round_winners)
+        winners = np.concatenate((winners, round_winners))
+        remaining = np.setdiff1d(remaining, round_winners, assume_unique=True)
+
+    return winners
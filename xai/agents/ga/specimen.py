@@ -1,5 +1,8 @@
 from typing import *
-from ...util import Cache, Load, Dump
+from ...util import Cache, Load, Dump, Mapped
+
+import numpy as np
+import uuid
 
 if TYPE_CHECKING:
     from numpy import generic
@@ -14,15 +17,26 @@ G = TypeVar("G", bound="""Genome[
             Reward[Observation[generic],Action]
             ]""")
 
+class Ancestry(NamedTuple):
+    # The specimen is child number child of parent1.breed(parent2, rng=np.random.default_rng(seed)).
+    parents:    Tuple[str,str]
+    seed:       np.random.SeedSequence
+    child:      int
+
 class Specimen(Generic[G]):
 
     def __init__(self, 
                  genome:    G, 
-                 in_memory: bool = False) -> None:
+                 in_memory: bool = False,
+                 ancestry:  Ancestry|None = None) -> None:
         super().__init__()
+        self.id = uuid.uuid4().hex
+        self.ancestry = ancestry
 
         if in_memory:
             self.location: Cache[G] = Load(data=genome)
+        elif genome.device == "cpu":
+            self.location = Mapped(data=genome)
         else:
             self.location = Dump(data=genome)
 
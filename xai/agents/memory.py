@@ -14,6 +14,9 @@ class Memory:
             self.last_observation = cast(FloatTensor, torch.zeros_like(tensor))
 
         delta = tensor - self.last_observation
-        result = cast(FloatTensor, torch.concatenate((tensor,delta), dim=0))
+        result = cast(FloatTensor, torch.concatenate((tensor,delta), dim=-1))
         self.last_observation = tensor
-        return result
\ No newline at end of file
+        return result
+    
+    def reset(self) -> None:
+        self.last_observation = None
\ No newline at end of file
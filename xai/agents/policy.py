@@ -4,6 +4,7 @@ from torch import FloatTensor
 from numpy.typing import NDArray
 
 import numpy as np
+import torch
 
 if TYPE_CHECKING:
     from ..games import Action
@@ -26,6 +27,8 @@ class Policy(Generic[A]):
         self._network_output = network_output
         self._actions = actions
         self._strategy = strategy
+        self._gradients: Dict[A,NDArray[np.float32]] = {}
+        self._prefetch: Callable[[],None]|None = None
 
     def action(self) -> A:
         return self._strategy(self)
@@ -56,22 +59,68 @@ class Policy(Generic[A]):
             return self.random()
 
     def gradients(self, action: A) -> NDArray[np.float32]:
-        self._network_input.grad = None
-        idx = self._actions.index(action)
-        self._network_output[idx].backward(retain_graph=True)
-        assert self._network_input.grad is not None
-        gradients = cast(FloatTensor, self._network_input.grad)
-        return gradients.numpy()
+        return self.jacobian((action,))[0]
+    
+    def jacobian(self, actions: Iterable[A]|None = None) -> NDArray[np.float32]:
+        actions = self._actions if actions is None else tuple(actions)
+        
+        if self._prefetch is not None and any(action not in self._gradients for action in actions):
+            prefetch, self._prefetch = self._prefetch, None
+            prefetch()
+
+        missing = tuple(dict.fromkeys(action for action in actions if action not in self._gradients))
+
+        if len(missing) == 1:
+            idx = self._actions.index(missing[0])
+            gradients, = torch.autograd.grad(self._network_output[idx], self._network_input, retain_graph=True)
+            self._gradients[missing[0]] = gradients.numpy()
+        elif len(missing) > 1:
+            # All missing rows of the Jacobian in a single vectorized backward pass.
+            selection = torch.zeros(
+                (len(missing), len(self._actions)), 
+                dtype=self._network_output.dtype, 
+                device=self._network_output.device
+            )
+            selection[range(len(missing)), [self._actions.index(action) for action in missing]] = 1
+            gradients, = torch.autograd.grad(
+                self._network_output, 
+                self._network_input, 
+                grad_outputs=selection, 
+                retain_graph=True, 
+                is_grads_batched=True
+            )
+            for action,action_gradients in zip(missing, gradients.numpy()):
+                self._gradients[action] = action_gradients
+
+        return np.stack([self._gradients[action] for action in actions])
+    
+    def cache_gradients(self, action: A, gradients: NDArray[np.float32]) -> None:
+        self._gradients[action] = gradients
+
+    def prefetch_gradients(self, prefetch: Callable[[],None]) -> None:
+        self._prefetch = prefetch
     
     def saliency(self, action: A) -> NDArray[np.float32]:
-        gradients = self.gradients(action)
+        return self._normalized(self.gradients(action))
+    
+    def saliencies(self, actions: Iterable[A]|None = None) -> Dict[A,NDArray[np.float32]]:
+        actions = self._actions if actions is None else tuple(dict.fromkeys(actions))
+        return {action: self._normalized(gradients) for action,gradients in zip(actions, self.jacobian(actions))}
+    
+    def _normalized(self, gradients: NDArray[np.float32]) -> NDArray[np.float32]:
         grads_abs: NDArray[np.float32] = np.abs(gradients)
         grad_abs_max = grads_abs.max()
         if grad_abs_max == 0:
             return np.zeros_like(grads_abs)
         else:
-            return grads_abs / grads_abs.max()
+            return grads_abs / grad_abs_max
     
+    def network_input(self) -> FloatTensor:
+        return self._network_input
+    
+    def network_output(self, action: A) -> FloatTensor:
+        return cast(FloatTensor, self._network_output[self._actions.index(action)])
+
     def action_space(self) -> Tuple[A,...]:
         return self._actions
         
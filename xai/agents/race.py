@@ -0,0 +1,150 @@
+from typing import *
+from numpy.typing import NDArray
+
+import multiprocessing as mp
+import numpy as np
+import ctypes
+import zlib
+
+from .fitness import Fitness, FitnessSchema, normalize_values
+
+if TYPE_CHECKING:
+    from ..agents import AgentResult
+
+class Race:
+
+    def __init__(self,
+                 contenders:        int,
+                 max_time_steps:    int,
+                 interval:          int = 100,
+                 categories:        int = 16) -> None:
+        super().__init__()
+        assert contenders > 0, "At least one contender must make the cut."
+        assert interval > 0, "Checkpoint interval must be positive."
+        assert categories > 0, "Fitness must have at least one reward category to race on."
+
+        self.contenders = contenders
+        self.interval = interval
+        self.checkpoints = max(1, max_time_steps//interval)
+        self.categories = categories
+
+        # Shared with the workers through inheritance. Episodes race on the rank of their rewards only, since
+        # penalties such as the step count accumulate for as long as an episode runs, and would rank every
+        # surviving episode behind the ones that ended early. Leaving them out keeps the bound optimistic, as
+        # penalties can only lower the final rank. For every checkpoint c, the minimum and maximum of every
+        # reward over the finished episodes after (c+1)*interval steps normalize those rewards as
+        # Fitness.normalize_all does, and the bound is the rank of the contenders-th best of them. The key
+        # identifies the fitness schema the bounds are for, and is 0 while there are none.
+        self._shared = mp.RawArray(ctypes.c_double, self.checkpoints*(2*categories + 1))
+        self._key = mp.RawValue(ctypes.c_int64, 0)
+        self._schema: FitnessSchema|None = None
+        self._progress: List[NDArray[np.float64]] = []
+        self._bind()
+        self.reset()
+
+    def reset(self) -> None:
+        self._key.value = 0
+        self._bounds[:] = -np.inf
+        self._schema = None
+        self._progress.clear()
+
+    def bounds(self) -> NDArray[np.float64]:
+        return self._bounds
+
+    def overtaken(self,
+                  step:         int,
+                  fitness:      Fitness,
+                  progress:     List[List[float]]) -> bool:
+        # Called by the playing agent after every step. Whenever the episode passes a checkpoint, returns whether
+        # the rank of its rewards has fallen behind the bound of that checkpoint, so that it cannot make the cut.
+        passed = min(step//self.interval, self.checkpoints)
+        if len(progress) >= passed:
+            return False
+
+        values = fitness.numpy()
+        while len(progress) < passed:
+            progress.append(values.tolist())
+
+        size = len(fitness.schema.rewards)
+        if size > self.categories or self._key.value != _schema_key(fitness.schema):
+            return False
+
+        checkpoint = passed - 1
+        rank = _ranks(values[:size], self._minimums[checkpoint,:size], self._maximums[checkpoint,:size])
+        return bool(rank < self._bounds[checkpoint])
+
+    def record(self, result: "AgentResult") -> None:
+        # Only finished episodes of the schema raced on move the bounds. An episode that ended early keeps its
+        # final fitness at the remaining checkpoints.
+        if result["aborted"] or "race_progress" not in result:
+            return
+
+        fitness = result["fitness"]
+        schema = fitness.schema
+        if self._schema is None and 0 < len(schema.rewards) <= self.categories:
+            self._schema = schema
+        if schema != self._schema or any(len(values) != schema.size() for values in result["race_progress"]):
+            return
+
+        progress = np.tile(fitness.numpy(), (self.checkpoints, 1))
+        if result["race_progress"]:
+            progress[:len(result["race_progress"])] = result["race_progress"]
+        self._progress.append(progress)
+
+        if len(self._progress) >= self.contenders:
+            size = len(schema.rewards)
+            rewards = np.stack(self._progress)[...,:size]
+            minimums = rewards.min(axis=0)
+            maximums = rewards.max(axis=0)
+            ranks = _ranks(rewards, minimums, maximums)
+
+            self._minimums[:,:size] = minimums
+            self._maximums[:,:size] = maximums
+            self._bounds[:] = np.partition(ranks, -self.contenders, axis=0)[-self.contenders]
+            self._key.value = _schema_key(schema)
+
+    @staticmethod
+    def report(results: Sequence["AgentResult"]) -> Dict[str,int|float]:
+        # Aborted episodes are assumed to have lasted as long as an average finished episode,
+        # so the saved steps are an estimate.
+        aborted = [result["steps_played"] for result in results if result["aborted"]]
+        finished = [result["steps_played"] for result in results if not result["aborted"]]
+        expected = sum(finished)/len(finished) if finished else 0.0
+        saved = sum(max(0.0, expected - steps) for steps in aborted)
+        played = sum(aborted) + sum(finished)
+        return {
+            "aborted_episodes": len(aborted),
+            "steps_played": played,
+            "steps_saved": saved,
+            "saved_fraction": saved/(played + saved) if played + saved > 0 else 0.0
+        }
+
+    def __getstate__(self) -> Dict[str,Any]:
+        state = self.__dict__.copy()
+        for name in ("_minimums", "_maximums", "_bounds"):
+            del state[name]
+        state["_progress"] = []
+        return state
+
+    def __setstate__(self, state: Dict[str,Any]) -> None:
+        self.__dict__.update(state)
+        self._bind()
+
+    def _bind(self) -> None:
+        shared = np.frombuffer(self._shared, dtype=np.float64).reshape(self.checkpoints, 2*self.categories + 1)
+        self._minimums: NDArray[np.float64] = shared[:,:self.categories]
+        self._maximums: NDArray[np.float64] = shared[:,self.categories:2*self.categories]
+        self._bounds: NDArray[np.float64] = shared[:,-1]
+
+
+def _schema_key(schema: FitnessSchema) -> int:
+    # Stable across processes, unlike hash(), and never 0.
+    return zlib.crc32(repr((schema.rewards, schema.penalties)).encode()) + 1
+
+def _ranks(rewards:     NDArray[np.float64],
+           minimums:    NDArray[np.float64],
+           maximums:    NDArray[np.float64]) -> NDArray[np.float64]:
+    # The rank of Fitness.normalize_all over the last axis without penalties, i.e. the product of the normalized
+    # rewards, where rewards beyond the minimums and maximums are clipped.
+    normalized = np.clip(normalize_values(rewards, minimums, maximums), 0.0, 1.0)
+    return cast(NDArray[np.float64], normalized.prod(axis=-1))
@@ -0,0 +1,88 @@
+from typing import *
+from numpy.typing import NDArray
+
+import numpy as np
+import importlib
+import json
+import os
+
+from ...agents import RingReplayBuffer
+
+if TYPE_CHECKING:
+    from numpy import generic
+    from ...games import Observation, Action, Reward
+
+O = TypeVar("O", bound="Observation[generic]")
+A = TypeVar("A", bound="Action")
+R = TypeVar("R", bound="Reward[Observation[generic],Action]")
+
+_STATE_FILE = "state.json"
+
+class MappedReplayBuffer(RingReplayBuffer[O,A,R]):
+
+    def __init__(self,
+                 path:          str,
+                 capacity:      int,
+                 seed:          int|None = None,
+                 prioritized:   bool = False,
+                 alpha:         float = 0.6,
+                 beta:          float = 0.4,
+                 epsilon:       float = 1e-6) -> None:
+        # Every array is a memory mapped .npy file in the directory at path, so only the pages that are pushed or
+        # sampled reside in memory, and the page cache decides which ones stay. An existing buffer is reopened
+        # as of its last flush, with the maximum priority for every transition.
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        super().__init__(capacity, seed=seed, prioritized=prioritized, alpha=alpha, beta=beta, epsilon=epsilon)
+
+        state_file = os.path.join(path, _STATE_FILE)
+        if os.path.isfile(state_file):
+            with open(state_file, "r") as file:
+                state: Dict[str,Any] = json.load(file)
+
+            assert state["capacity"] == capacity, f"{path} holds a buffer of capacity {state['capacity']}."
+            if state["frame_shape"] is not None:
+                self._frames = self._allocate("frames", (capacity, *state["frame_shape"]), np.uint8)
+            if state["action"] is not None:
+                module, _, name = state["action"].rpartition(".")
+                self._members = tuple(getattr(importlib.import_module(module), name))
+                self._indices = {member: index for index,member in enumerate(self._members)}
+
+            self._next = state["next"]
+            self._slots = state["slots"]
+            self._transitions = int(self._valid.sum())
+            self._reset_priorities()
+        else:
+            self._valid[:] = False
+
+    def flush(self) -> None:
+        # The arrays go first and the state last, so a crash in between leaves a buffer as of the previous flush,
+        # apart from the slots that were overwritten since.
+        for array in (self._frames, self._actions, self._rewards, self._dones, self._valid):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+        action_type = type(self._members[0]) if self._members else None
+        temporary = os.path.join(self.path, f"{_STATE_FILE}.tmp")
+        with open(temporary, "w") as file:
+            json.dump({
+                "capacity": self.capacity,
+                "frame_shape": None if self._frames is None else list(self._frames.shape[1:]),
+                "action": None if action_type is None else f"{action_type.__module__}.{action_type.__qualname__}",
+                "next": self._next,
+                "slots": self._slots
+            }, file)
+        os.replace(temporary, os.path.join(self.path, _STATE_FILE))
+
+    def _allocate(self,
+                  name:     str,
+                  shape:    Tuple[int,...],
+                  dtype:    "type[np.generic]") -> NDArray[Any]:
+        file = os.path.join(self.path, f"{name}.npy")
+        if os.path.isfile(file):
+            array: NDArray[Any] = np.load(file, mmap_mode="r+")
+            assert array.shape == shape and array.dtype == dtype, f"{file} does not match a buffer of capacity {self.capacity}."
+            return array
+
+        # Sparse, so the file only takes disk space as slots are written.
+        return np.lib.format.open_memmap(file, mode="w+", dtype=dtype, shape=shape)
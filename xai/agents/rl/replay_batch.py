@@ -0,0 +1,16 @@
+from typing import *
+from torch import Tensor
+
+class ReplayBatch(NamedTuple):
+    # Transitions sampled from a RingReplayBuffer, as contiguous tensors with the batch as first dimension.
+    # Observations are (batch x channels x height x width), actions are indices into the members of the action enum,
+    # and weights are the importance sampling weights of a prioritized buffer, or ones. Stamps identify the transitions
+    # at their slots when sampled, so that update_priorities can skip slots that were overwritten since.
+    observations: Tensor
+    actions: Tensor
+    rewards: Tensor
+    next_observations: Tensor
+    dones: Tensor
+    indices: Tensor
+    weights: Tensor
+    stamps: Tensor
@@ -0,0 +1,355 @@
+from typing import *
+from numpy.typing import NDArray
+
+import numpy as np
+import threading
+import queue
+import torch
+
+from ...util import literals
+from ...agents import ReplayBatch, SumTree, MinTree
+
+if TYPE_CHECKING:
+    from numpy import generic
+    from ...games import Observation, Action, Reward
+    from ...util import Device, DataType
+
+O = TypeVar("O", bound="Observation[generic]")
+A = TypeVar("A", bound="Action")
+R = TypeVar("R", bound="Reward[Observation[generic],Action]")
+
+class RingReplayBuffer(Generic[O,A,R]):
+
+    def __init__(self,
+                 capacity:      int,
+                 seed:          int|None = None,
+                 prioritized:   bool = False,
+                 alpha:         float = 0.6,
+                 beta:          float = 0.4,
+                 epsilon:       float = 1e-6) -> None:
+        super().__init__()
+        assert capacity > 1, "The buffer must hold at least one transition and its previous frame."
+        assert alpha >= 0 and beta >= 0 and epsilon > 0, "Prioritization exponents must not be negative, and epsilon must be positive."
+
+        # Every slot holds one frame, and the transition whose next observation is that frame. Its last observation
+        # is the frame of the previous slot, so consecutive transitions share their frames. The first frame of an
+        # episode takes a slot without a transition. The frames are allocated on the first push, once their
+        # shape is known.
+        self.capacity = capacity
+        self._rng = np.random.default_rng(seed)
+        self._frames: NDArray[np.uint8]|None = None
+        self._actions: NDArray[np.int64] = self._allocate("actions", (capacity,), np.int64)
+        self._rewards: NDArray[np.float32] = self._allocate("rewards", (capacity,), np.float32)
+        self._dones: NDArray[np.bool_] = self._allocate("dones", (capacity,), np.bool_)
+        self._valid: NDArray[np.bool_] = self._allocate("valid", (capacity,), np.bool_)
+
+        # Incremented when a push starts writing a slot and again when the push is complete, so a slot is stamped
+        # odd while its frame or transition is incomplete, and batches gathered while pushing can be checked.
+        self._stamps: NDArray[np.int64] = np.zeros(capacity, dtype=np.int64)
+
+        self._members: Tuple[A,...] = ()
+        self._indices: Dict[A,int] = {}
+        self._last_observation: O|None = None
+        self._next = 0
+        self._slots = 0
+        self._transitions = 0
+
+        # Prioritized, transitions are sampled with probability priority^alpha over the sum of every priority^alpha,
+        # where priorities are absolute TD errors plus epsilon, and new transitions get the maximum priority so far.
+        # The sum tree holds priority^alpha of every valid slot, and 0 of every other slot.
+        self.alpha = alpha
+        self.beta = beta
+        self.epsilon = epsilon
+        self._sums = SumTree(capacity) if prioritized else None
+        self._minimums = MinTree(capacity) if prioritized else None
+        self._max_priority = 1.0
+
+        # Guards the trees, which pushing and updating priorities change while a prefetch thread may walk them.
+        self._lock = threading.Lock()
+
+    def size(self) -> int:
+        return self._transitions
+
+    def __len__(self) -> int:
+        return self._transitions
+
+    def push(self,
+             last_observation:      O,
+             action:                A,
+             reward:                R,
+             current_observation:   O,
+             done:                  bool = False) -> int:
+        # The last observation is only written if it is not the current observation of the previous push.
+        written: List[int] = []
+        if self._last_observation is not last_observation:
+            written.append(self._write(last_observation))
+
+        if not self._indices:
+            self._members = tuple(type(action))
+            self._indices = {member: index for index,member in enumerate(self._members)}
+
+        slot = self._write(current_observation)
+        written.append(slot)
+        self._actions[slot] = self._indices[action]
+        self._rewards[slot] = reward.native_game_reward()
+        self._dones[slot] = done
+        self._valid[slot] = True
+        self._transitions += 1
+        self._prioritize(slot, self._max_priority**self.alpha)
+        self._stamps[written] += 1
+
+        # Episodes end with their last push, so a new episode never shares the final frame.
+        self._last_observation = None if done else current_observation
+        return slot
+
+    def sample(self,
+               batch_size:  int,
+               device:      "Device" = "cpu",
+               dtype:       "DataType" = "float32") -> ReplayBatch:
+        assert self._transitions > 0, "Cannot sample from an empty buffer."
+
+        # Batches whose slots, or the slots of their last observations, were being pushed before gathering or were
+        # pushed while gathering are drawn again, which only happens when sampling on another thread than pushing,
+        # see prefetch.
+        while True:
+            indices = self.sample_indices(batch_size)
+            slots = np.concatenate((indices, (indices - 1)%self.capacity))
+            stamps = self._stamps[slots]
+            if (stamps & 1).any():
+                continue
+            batch = self._gather(indices, stamps[:len(indices)], device=device, dtype=dtype)
+            if np.array_equal(stamps, self._stamps[slots]) and self._valid[indices].all():
+                return batch
+
+    def prefetch(self,
+                 batch_size:    int,
+                 depth:         int = 2,
+                 device:        "Device" = "cpu",
+                 dtype:         "DataType" = "float32") -> "Prefetcher":
+        # Samples batches on a background thread, while the caller trains on the previous ones. Sampling starts
+        # once the buffer holds batch_size transitions, so the prefetcher may be created before warming up:
+        #
+        #   with buffer.prefetch(32) as batches:
+        #       for step in ...:
+        #           buffer.push(...)
+        #           batch = next(batches)
+        return Prefetcher(
+            lambda: self.sample(batch_size, device=device, dtype=dtype),
+            ready=lambda: self._transitions >= batch_size,
+            depth=depth
+        )
+
+    def sample_indices(self, batch_size: int) -> NDArray[np.int64]:
+        if self._sums is None:
+            # Uniform over the transitions, by redrawing the few slots that only hold the first frame of an episode.
+            indices = self._rng.integers(0, self._slots, size=batch_size)
+            invalid = ~self._valid[indices]
+            while invalid.any():
+                indices[invalid] = self._rng.integers(0, self._slots, size=int(invalid.sum()))
+                invalid = ~self._valid[indices]
+            return indices
+
+        # Stratified, i.e. one prefix sum from each of batch_size equal segments of the total. Leaves of
+        # priority 0, which rounding may hit, are redrawn.
+        with self._lock:
+            total = self._sums.total()
+            indices = self._sums.find((np.arange(batch_size) + self._rng.random(batch_size))*(total/batch_size))
+            invalid = ~self._valid[indices] | (self._sums[indices] <= 0)
+            while invalid.any():
+                indices[invalid] = self._sums.find(self._rng.random(int(invalid.sum()))*total)
+                invalid = ~self._valid[indices] | (self._sums[indices] <= 0)
+            return indices
+
+    def update_priorities(self,
+                          indices:      NDArray[np.int64]|torch.Tensor,
+                          td_errors:    NDArray[np.floating[Any]]|torch.Tensor,
+                          stamps:       NDArray[np.int64]|torch.Tensor) -> None:
+        # Batched, with the indices, the TD errors and the stamps of a sampled batch. Slots that no longer hold
+        # the sampled transition, i.e. were invalidated or overwritten since, are skipped.
+        assert self._sums is not None and self._minimums is not None, "Only a prioritized buffer has priorities."
+        indices = indices.cpu().numpy() if isinstance(indices, torch.Tensor) else np.asarray(indices)
+        stamps = stamps.cpu().numpy() if isinstance(stamps, torch.Tensor) else np.asarray(stamps)
+        errors = td_errors.detach().cpu().numpy() if isinstance(td_errors, torch.Tensor) else np.asarray(td_errors)
+
+        priorities = np.abs(errors.astype(np.float64)).reshape(-1) + self.epsilon
+        current = self._valid[indices] & (self._stamps[indices] == stamps)
+        if not current.any():
+            return
+
+        with self._lock:
+            self._max_priority = max(self._max_priority, float(priorities[current].max()))
+            self._sums.update(indices[current], priorities[current]**self.alpha)
+            self._minimums.update(indices[current], priorities[current]**self.alpha)
+
+    def priorities(self, indices: NDArray[np.int64]) -> NDArray[np.float64]:
+        assert self._sums is not None, "Only a prioritized buffer has priorities."
+        return cast(NDArray[np.float64], self._sums[indices]**(1/self.alpha) if self.alpha > 0 else np.ones(len(indices)))
+
+    def gather(self,
+               indices: NDArray[np.int64],
+               device:  "Device" = "cpu",
+               dtype:   "DataType" = "float32") -> ReplayBatch:
+        assert self._valid[indices].all(), "Every index must hold a transition."
+        return self._gather(indices, self._stamps[indices], device=device, dtype=dtype)
+
+    def _gather(self,
+                indices:    NDArray[np.int64],
+                stamps:     NDArray[np.int64],
+                device:     "Device",
+                dtype:      "DataType") -> ReplayBatch:
+        assert self._frames is not None
+
+        # The frames are gathered as uint8 and only converted on the device, which moves a quarter of the bytes.
+        def frames(slots: NDArray[np.int64]) -> torch.Tensor:
+            batch = torch.from_numpy(cast(NDArray[np.uint8], self._frames)[slots]).to(device)
+            return batch.to(literals.torch_dtype(dtype)).div_(255)
+
+        # Importance sampling weights (N*P(i))^-beta, normalized by the largest possible weight, which reduce to
+        # (min priority^alpha / priority^alpha)^beta.
+        if self._sums is None or self._minimums is None:
+            weights = np.ones(len(indices), dtype=np.float32)
+        else:
+            with self._lock:
+                weights = ((self._minimums.minimum()/self._sums[indices])**self.beta).astype(np.float32)
+
+        return ReplayBatch(
+            observations=frames((indices - 1)%self.capacity),
+            actions=torch.from_numpy(self._actions[indices]).to(device),
+            rewards=torch.from_numpy(self._rewards[indices]).to(device),
+            next_observations=frames(indices),
+            dones=torch.from_numpy(self._dones[indices]).to(device),
+            indices=torch.from_numpy(indices),
+            weights=torch.from_numpy(weights).to(device),
+            stamps=torch.from_numpy(stamps)
+        )
+
+    def action(self, index: int) -> A:
+        return self._members[index]
+
+    def clear(self) -> None:
+        self._stamps += 2
+        self._valid[:] = False
+        self._last_observation = None
+        self._next = 0
+        self._slots = 0
+        self._transitions = 0
+        self._reset_priorities()
+
+    def _reset_priorities(self) -> None:
+        # Every valid slot gets the maximum priority, e.g. after reopening a buffer whose priorities were not kept.
+        if self._sums is None or self._minimums is None:
+            return
+
+        with self._lock:
+            self._sums.reset()
+            self._minimums.reset()
+            valid = np.flatnonzero(self._valid)
+            if valid.size > 0:
+                self._sums.update(valid, np.full(valid.size, self._max_priority**self.alpha))
+                self._minimums.update(valid, np.full(valid.size, self._max_priority**self.alpha))
+
+    def _prioritize(self, slot: int, priority: float) -> None:
+        # Priority 0 removes the slot from sampling.
+        if self._sums is None or self._minimums is None:
+            return
+
+        with self._lock:
+            self._sums.set(slot, priority)
+            self._minimums.set(slot, priority if priority > 0 else np.inf)
+
+    def _write(self, observation: O) -> int:
+        # Frames are stored channels first, so that sampled batches need no transpose.
+        frame = observation.numpy().transpose(2,0,1)
+        if self._frames is None:
+            self._frames = self._allocate("frames", (self.capacity, *frame.shape), np.uint8)
+
+        slot = self._next
+        self._stamps[slot] += 1
+        self._frames[slot] = frame
+
+        # The overwritten transition is gone, and so is the last observation of the transition in the next slot.
+        if self._valid[slot]:
+            self._valid[slot] = False
+            self._transitions -= 1
+            self._prioritize(slot, 0.0)
+        following = (slot + 1)%self.capacity
+        if self._slots == self.capacity and self._valid[following]:
+            self._valid[following] = False
+            self._transitions -= 1
+            self._prioritize(following, 0.0)
+
+        self._next = following
+        self._slots = min(self._slots + 1, self.capacity)
+        return slot
+
+    def _allocate(self,
+                  name:     str,
+                  shape:    Tuple[int,...],
+                  dtype:    "type[np.generic]") -> NDArray[Any]:
+        return np.zeros(shape, dtype=dtype)
+
+
+class Prefetcher:
+
+    def __init__(self,
+                 sample:    Callable[[],ReplayBatch],
+                 ready:     Callable[[],bool] = lambda: True,
+                 depth:     int = 2) -> None:
+        super().__init__()
+        assert depth > 0, "At least one batch must be prefetched."
+
+        self._sample = sample
+        self._ready = ready
+        self._batches: "queue.Queue[ReplayBatch]" = queue.Queue(maxsize=depth)
+        self._error: BaseException|None = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "Prefetcher":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[ReplayBatch]:
+        return self
+
+    def __next__(self) -> ReplayBatch:
+        # Once the thread has ended, the remaining batches are returned, and then its error is raised by every call.
+        while True:
+            try:
+                return self._batches.get(timeout=0.1)
+            except queue.Empty:
+                if self._thread.is_alive():
+                    continue
+
+            try:
+                return self._batches.get_nowait()
+            except queue.Empty:
+                if self._error is not None:
+                    raise self._error
+                raise RuntimeError("The prefetcher is closed.")
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        # Errors end the thread and are kept, so that __next__ raises them instead of waiting for batches forever.
+        while not self._stopped.is_set():
+            try:
+                if not self._ready():
+                    self._stopped.wait(0.01)
+                    continue
+                batch = self._sample()
+            except BaseException as error:
+                self._error = error
+                return
+
+            while not self._stopped.is_set():
+                try:
+                    self._batches.put(batch, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
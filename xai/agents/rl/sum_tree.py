@@ -0,0 +1,80 @@
+from typing import *
+from numpy.typing import NDArray, ArrayLike
+
+import numpy as np
+
+class SegmentTree:
+
+    def __init__(self,
+                 capacity:  int,
+                 operation: Callable[[NDArray[np.float64],NDArray[np.float64]],NDArray[np.float64]],
+                 neutral:   float) -> None:
+        super().__init__()
+        assert capacity > 0, "The tree must have at least one leaf."
+
+        # A complete binary tree in an array, with the root at 1 and the children of node n at 2n and 2n + 1.
+        # Every node holds the operation over its leaves, and every leaf beyond the capacity holds neutral.
+        self.capacity = capacity
+        self._leaves = 1 << (capacity - 1).bit_length()
+        self._depth = self._leaves.bit_length() - 1
+        self._operation = operation
+        self._neutral = neutral
+        self._tree: NDArray[np.float64] = np.full(2*self._leaves, neutral, dtype=np.float64)
+
+    def set(self, index: int, value: float) -> None:
+        # O(log n) for a single leaf, without the overhead of the batched update.
+        node = index + self._leaves
+        self._tree[node] = value
+        while node > 1:
+            node >>= 1
+            self._tree[node] = self._operation(self._tree[2*node], self._tree[2*node + 1])
+
+    def update(self,
+               indices: ArrayLike,
+               values:  ArrayLike) -> None:
+        # O(k log n) for k leaves, one level at a time. Of duplicate indices, the last value is kept.
+        nodes = np.asarray(indices, dtype=np.int64) + self._leaves
+        self._tree[nodes] = values
+        nodes = np.unique(nodes >> 1)
+        while nodes.size > 0:
+            self._tree[nodes] = self._operation(self._tree[2*nodes], self._tree[2*nodes + 1])
+            nodes = np.unique(nodes[nodes > 1] >> 1)
+
+    def reset(self) -> None:
+        self._tree[:] = self._neutral
+
+    def root(self) -> float:
+        return float(self._tree[1])
+
+    def __getitem__(self, indices: ArrayLike) -> NDArray[np.float64]:
+        return self._tree[np.asarray(indices, dtype=np.int64) + self._leaves]
+
+
+class SumTree(SegmentTree):
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__(capacity, operation=np.add, neutral=0.0)
+
+    def total(self) -> float:
+        return self.root()
+
+    def find(self, prefixes: ArrayLike) -> NDArray[np.int64]:
+        # The leaf of every prefix sum in [0, total), i.e. leaf i is found with probability value i / total,
+        # by descending all prefixes at once.
+        remaining = np.array(prefixes, dtype=np.float64)
+        nodes = np.ones(remaining.shape, dtype=np.int64)
+        for _ in range(self._depth):
+            left = 2*nodes
+            right = remaining >= self._tree[left]
+            remaining -= np.where(right, self._tree[left], 0.0)
+            nodes = left + right
+        return cast(NDArray[np.int64], np.minimum(nodes - self._leaves, self.capacity - 1))
+
+
+class MinTree(SegmentTree):
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__(capacity, operation=np.minimum, neutral=np.inf)
+
+    def minimum(self) -> float:
+        return self.root()
@@ -0,0 +1,30 @@
+from typing import *
+
+class SalienceSampler:
+
+    def __init__(self, interval: int = 1) -> None:
+        super().__init__()
+        assert interval > 0, "Sampling interval must be positive."
+        self.interval = interval
+        self._penalty: float|None = None
+        self._sampled_step = 0
+        self._last_step = 0
+
+    def penalty(self, game_step: int, compute: Callable[[],float]) -> float:
+        if self.interval == 1:
+            return compute()
+
+        # A decreasing game step means that a new episode has started.
+        if self._penalty is None or\
+            game_step < self._last_step or\
+            game_step - self._sampled_step >= self.interval:
+            self._penalty = compute()
+            self._sampled_step = game_step
+
+        self._last_step = game_step
+        return self._penalty
+
+    def reset(self) -> None:
+        self._penalty = None
+        self._sampled_step = 0
+        self._last_step = 0
@@ -2,6 +2,7 @@ from typing import *
 
 from .env import Environment
 from .action import Action
-from .observation import Observation
+from .observation import Observation, Frame
 from .reward import Reward
-from .game_stats import GameStats
\ No newline at end of file
+from .game_stats import GameStats
+from .vector_env import VectorEnvironment
\ No newline at end of file
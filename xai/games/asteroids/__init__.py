@@ -1,4 +1,5 @@
 from .reward import AsteroidsReward
-from .observation import AsteroidsObservation
+from .observation import AsteroidsObservation, AsteroidsPreprocessing
 from .action import AsteroidsAction
-from .asteroids import Asteroids
\ No newline at end of file
+from .asteroids import Asteroids
+from .vector_asteroids import VectorAsteroids
\ No newline at end of file
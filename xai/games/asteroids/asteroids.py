@@ -1,8 +1,10 @@
 from typing import *
 from ale_py import ALEInterface, ALEState
 from random import random
+from numpy.typing import NDArray
 
 import gymnasium as gym
+import numpy as np
 import cv2
 
 from ..env import Environment
@@ -13,11 +15,16 @@ from .action import AsteroidsAction
 
 class Asteroids(Environment[AsteroidsObservation,AsteroidsAction,AsteroidsReward]):
 
-    def __init__(self) -> None:
+    def __init__(self, sticky_actions: float = 0.0) -> None:
         
         self._ale: ALEInterface = gym.make("Asteroids-v4")\
             .get_wrapper_attr("ale")
         
+        assert 0.0 <= sticky_actions <= 1.0, "Sticky action probability must be in [0,1]."
+        self.sticky_actions = sticky_actions
+        self._last_action = AsteroidsAction.NOOP
+        self._ram: NDArray[np.uint8] = np.zeros(128, dtype=np.uint8)
+        
         height, width = self._ale.getScreenDims()
         observation_shape = (height, width, 3)
         super().__init__(observation_shape=observation_shape)
@@ -31,49 +38,59 @@ class Asteroids(Environment[AsteroidsObservation,AsteroidsAction,AsteroidsReward
         native_rewards: List[int|float] = []
         images: List[AsteroidsObservation] = []
 
-        for _ in range(steps):
-            reward = 0
-            if stochastic:
-                if random() < 0.5:
-                    reward += self._step_spaceship(AsteroidsAction.NOOP)
-                else:
-                    reward += self._step_asteroids(AsteroidsAction.NOOP)
+        # One allocation for every layer of this step. The layers are views, so they remain
+        # valid after later steps, since previous observations are still referenced by the caller.
+        screens = np.empty((steps,2) + self.observation_shape, dtype=np.uint8)
 
-            reward += self._step_spaceship(action)
-            reward += self._step_asteroids(action)
+        for spaceship,asteroids in screens:
+            reward = 0
+            executed = action
+            if stochastic and self.sticky_actions > 0.0:
+                # Sticky actions add the randomness without emulating an extra frame.
+                if random() < self.sticky_actions:
+                    executed = self._last_action
+            elif stochastic:
+                # The screen of this phase is overwritten by the next phase of the same layer.
+                reward += self._act(AsteroidsAction.NOOP, spaceship=random() < 0.5)
+
+            reward += self._act(executed, spaceship=True, screen=spaceship)
+            reward += self._act(executed, spaceship=False, screen=asteroids)
+            self._last_action = executed
 
             native_rewards.append(reward)
-            images.append(AsteroidsObservation(
-                spaceship=self.spaceship,
-                asteroids=self.asteroids,
+            self.spaceship, self.asteroids = spaceship, asteroids
+            self._observation = AsteroidsObservation(
+                spaceship=spaceship,
+                asteroids=asteroids,
                 spaceship_angle=self.get_angle()
-            ))
+            )
+            images.append(self._observation)
+
+            # Repeating an action past the end of the game would only emulate dead frames.
+            if self._ale.game_over():
+                break
         
         return AsteroidsReward(
             values=native_rewards,
             observations=images,
-            actions=[action]*steps
+            actions=[action]*len(native_rewards)
         )
 
     def render(self) -> AsteroidsObservation:
-        return AsteroidsObservation(
-            spaceship=self.spaceship, 
-            asteroids=self.asteroids,
-            spaceship_angle=self.get_angle()
-            )
-    
-    def _step_asteroids(self, action: AsteroidsAction) -> int:
-        flags = int(self._ale.getRAM()[57])
-        self._ale.setRAM(57,~1&flags)
-        reward = self._ale.act(action.value)
-        self.asteroids = self._ale.getScreenRGB()
-        return reward
+        return self._observation
     
-    def _step_spaceship(self, action: AsteroidsAction) -> int:
-        flags = int(self._ale.getRAM()[57])
-        self._ale.setRAM(57,1|flags)
+    def _act(self, 
+             action:    AsteroidsAction, 
+             spaceship: bool, 
+             screen:    NDArray[np.uint8]|None = None) -> int:
+        # RAM byte 57 is a frame counter whose parity selects the layer that is drawn. 
+        # Every frame increments it, so _ram is refreshed after every act to stay current.
+        flags = int(self._ram[57])
+        self._ale.setRAM(57, 1|flags if spaceship else ~1&flags)
         reward = self._ale.act(action.value)
-        self.spaceship = self._ale.getScreenRGB()
+        self._ale.getRAM(self._ram)
+        if screen is not None:
+            self._ale.getScreenRGB(screen)
         return reward
         
     def running(self) -> bool:
@@ -83,11 +100,13 @@ class Asteroids(Environment[AsteroidsObservation,AsteroidsAction,AsteroidsReward
         return self._ale.lives()
     
     def get_angle(self) -> float:
-        angle_step = self._ale.getRAM()[60] & 0xf
+        angle_step = self._ram[60] & 0xf
         return self._angle_steps_to_radians[angle_step]
 
     def reset(self) -> None:
         self._ale.reset_game()
+        self._ale.getRAM(self._ram)
+        self._last_action = AsteroidsAction.NOOP
         self._angle_steps_to_radians = (
             0.0, 
             0.23186466084938862, 
@@ -114,6 +133,7 @@ class Asteroids(Environment[AsteroidsObservation,AsteroidsAction,AsteroidsReward
     
     def restore_state(self, state: ALEState) -> None:
         self._ale.restoreState(state)
+        self._ale.getRAM(self._ram)
 
     def play(self,
              fps:           int = 60,
@@ -1,14 +1,18 @@
 from typing import *
+from dataclasses import dataclass
 from numpy.typing import NDArray
 
 import matplotlib.image as im
 import matplotlib.pyplot as plt
 import numpy as np
+import functools
+import cv2
 
-from ...games import Observation
+from ...games import Observation, Frame
 
 _PLAYER_COLOR = (240,128,128)
 _Y_START, _Y_END = 18, 195
+_SCREEN_SHAPE = (210,160,3)
 
 _CMAP = Literal[
             "viridis", "plasma", "inferno", "magma", "cividis",
@@ -27,6 +31,54 @@ _CMAP = Literal[
             "rainbow", "jet", "turbo", "nipy_spectral", "gist_ncar"]
 
 
+@dataclass(frozen=True)
+class AsteroidsPreprocessing:
+    color: Literal["rgb", "grayscale", "merge"] = "rgb"
+    crop: bool = False
+    downsampling: int = 1
+
+    def __post_init__(self) -> None:
+        assert self.downsampling > 0, "Downsampling factor must be positive."
+
+    def shape(self, observation_shape: Tuple[int,int,int] = _SCREEN_SHAPE) -> Tuple[int,int,int]:
+        height,width,channels = observation_shape
+        if self.crop:
+            height = _Y_END - _Y_START
+        if self.color != "rgb":
+            channels = 1
+        return height//self.downsampling, width//self.downsampling, channels
+    
+    def size(self, observation_shape: Tuple[int,int,int] = _SCREEN_SHAPE) -> int:
+        height,width,channels = self.shape(observation_shape)
+        return height*width*channels
+    
+    def is_identity(self) -> bool:
+        return self.color == "rgb" and not self.crop and self.downsampling == 1
+
+    def __call__(self, frame: NDArray[np.uint8]) -> NDArray[np.uint8]:
+        if self.crop:
+            frame = frame[_Y_START:_Y_END]
+
+        match self.color:
+            case "grayscale":
+                frame = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+            case "merge":
+                frame = frame.max(axis=2)
+
+        if self.downsampling > 1:
+            height,width = frame.shape[:2]
+            frame = cv2.resize(
+                frame, 
+                (width//self.downsampling, height//self.downsampling), 
+                interpolation=cv2.INTER_AREA
+            )
+
+        if frame.ndim == 2:
+            frame = frame[:,:,np.newaxis]
+
+        return frame
+
+
 class AsteroidsObservation(Observation[np.uint8]): 
 
     def __init__(self,
@@ -36,10 +88,36 @@ class AsteroidsObservation(Observation[np.uint8]):
         self.spaceship = spaceship
         self.asteroids = asteroids
         self.spaceship_angle: float|None = spaceship_angle
+        self._player: Tuple[int,int]|None|Literal[False] = False
 
     def numpy(self) -> NDArray[np.uint8]:
         return self.spaceship | self.asteroids
     
+    def preprocessed(self, preprocessing: AsteroidsPreprocessing) -> Observation[np.uint8]:
+        if preprocessing.is_identity():
+            return self
+        else:
+            return Frame(preprocessing(self.numpy()))
+    
+    def translate_coordinates(self,
+                              y:            NDArray[np.intp],
+                              x:            NDArray[np.intp],
+                              new_center:   Tuple[int,int]) -> Tuple[NDArray[np.intp],NDArray[np.intp]]:
+        Y,X = _Y_END - _Y_START, self.spaceship.shape[1]
+        old_center = Y//2, X//2
+        dy = old_center[0] - new_center[0]
+        dx = old_center[1] - new_center[1]
+
+        within = (y >= _Y_START) & (y < _Y_END)
+        translated_y = np.where(within, (y - _Y_START + dy)%Y + _Y_START, y)
+        translated_x = np.where(within, (x + dx)%X, x)
+        return translated_y, translated_x
+    
+    def asteroid_pixels(self) -> Tuple[NDArray[np.intp],NDArray[np.intp]]:
+        asteroids = self.asteroids
+        y,x = np.nonzero(asteroids[...,0].astype(bool) & asteroids[...,1].astype(bool) & asteroids[...,2].astype(bool))
+        return y,x
+
     def translated(self, new_center: Tuple[int,int]|None = None) -> "AsteroidsObservation":
         if new_center is None:
             new_center = self.find_player()
@@ -124,6 +202,47 @@ class AsteroidsObservation(Observation[np.uint8]):
                 asteroids=rotate_layer(self.asteroids, radians=self.spaceship_angle)
             )
     
+    def ego_centric(self) -> "AsteroidsObservation":
+        # Equivalent to translated().rotated(), but the rotation is a cached scatter map per angle,
+        # and the translation is folded into the source indices of that map.
+        if self.spaceship_angle is None:
+            return self.translated()
+        
+        Y,X = _Y_END - _Y_START, self.spaceship.shape[1]
+        indptr, entries, destinations = _rotation_map(self.spaceship_angle, Y, X)
+
+        new_center = self.find_player()
+        if new_center is None:
+            dy,dx = 0,0
+        else:
+            dy = Y//2 - new_center[0]
+            dx = X//2 - new_center[1]
+
+        def rotate_layer(layer: NDArray[np.uint8]) -> NDArray[np.uint8]:
+            layer_copy = layer.copy()
+            layer_view = layer_copy[_Y_START:_Y_END]
+            layer_view[:] = 0
+
+            source = layer[_Y_START:_Y_END].reshape(-1, layer.shape[2])
+            occupied = np.flatnonzero(source)//source.shape[1]
+            occupied = occupied[np.diff(occupied, prepend=-1) != 0]
+            translated = ((occupied//X + dy)%Y)*X + (occupied%X + dx)%X
+
+            starts = indptr[translated]
+            counts = indptr[translated + 1] - starts
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            selected = entries[np.repeat(starts, counts) + offsets]
+
+            # Restore the write order of rotated(), where the last write to a pixel wins.
+            order = np.argsort(selected)
+            layer_view.reshape(-1, layer.shape[2])[destinations[selected[order]]] = source[np.repeat(occupied, counts)[order]]
+            return layer_copy
+        
+        return AsteroidsObservation(
+            spaceship=rotate_layer(self.spaceship),
+            asteroids=rotate_layer(self.asteroids)
+        )
+    
     def show(self, cmap: _CMAP|None = None) -> None:
         plt.imshow(self.numpy(), cmap=cmap)
         plt.show()
@@ -133,12 +252,19 @@ class AsteroidsObservation(Observation[np.uint8]):
 
     def find_player(self, color: Tuple[int,int,int]|None = None) -> Tuple[int,int]|None:
         if color is None:
-            color = _PLAYER_COLOR
+            if self._player is False:
+                self._player = self._find_player(_PLAYER_COLOR)
+            return self._player
+        else:
+            return self._find_player(color)
+        
+    def _find_player(self, color: Tuple[int,int,int]) -> Tuple[int,int]|None:
 
         spaceship_view = self.spaceship[_Y_START:_Y_END]
         Y,X,_ = spaceship_view.shape
 
-        player_indices = np.argwhere(np.all(spaceship_view == color, axis=2))
+        r,g,b = color
+        player_indices = np.argwhere((spaceship_view[...,0] == r) & (spaceship_view[...,1] == g) & (spaceship_view[...,2] == b))
 
         if np.any(player_indices[:,0] > (Y*3)//4):
             player_indices[player_indices[:,0] <= Y//4,0] += Y
@@ -151,4 +277,48 @@ class AsteroidsObservation(Observation[np.uint8]):
             return py,px
         
         return None
-    
\ No newline at end of file
+
+
+@functools.lru_cache(maxsize=None)
+def _rotation_map(radians: float, height: int, width: int) -> Tuple[NDArray[np.intp],NDArray[np.intp],NDArray[np.intp]]:
+    # Replays rotated() for every pixel of the view, in the same write order,
+    # so that only the entries of occupied pixels must be selected at runtime.
+    radians = -radians
+
+    Y,X = height, width
+    y_center,x_center = Y//2, X//2
+
+    idy,idx = np.divmod(np.arange(Y*X), X)
+
+    y_ref = np.concatenate([idy-Y,idy,idy+Y]*3) - y_center
+    x_ref = np.concatenate([idx-X]*3 + [idx]*3 + [idx+X]*3) - x_center
+
+    y_rot = np.array(y_ref*np.cos(radians) - x_ref*np.sin(radians) + y_center)
+    x_rot = np.array(y_ref*np.sin(radians) + x_ref*np.cos(radians) + x_center)
+
+    y_rot_loc = np.array([
+        y_rot - 0.5,
+        y_rot,
+        y_rot + 0.5
+    ], dtype=int)
+
+    x_rot_loc = np.array([
+        x_rot - 0.5,
+        x_rot,
+        x_rot + 0.5
+    ], dtype=int)
+
+    within = (y_rot_loc >= 0) & (y_rot_loc < Y) & (x_rot_loc >= 0) & (x_rot_loc < X)
+
+    sources = np.concatenate([((y_ref[within[i]] + y_center)%Y)*X + (x_ref[within[i]] + x_center)%X for i in range(3)])
+    destinations = np.concatenate([y_rot_loc[i][within[i]]*X + x_rot_loc[i][within[i]] for i in range(3)])
+
+    # Entries grouped by source pixel (CSR), where entries[indptr[p]:indptr[p+1]] are 
+    # the write positions of pixel p, so the selected entries can be sorted back into write order.
+    entries = np.argsort(sources, kind="stable")
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(sources, minlength=Y*X))))
+
+    for array in (indptr, entries, destinations):
+        array.setflags(write=False)
+
+    return indptr, entries, destinations
@@ -3,6 +3,7 @@ from dataclasses import dataclass
 from numpy.typing import NDArray
 
 import numpy as np
+import functools
 
 from ...games import Reward
 
@@ -18,36 +19,37 @@ class AsteroidsReward(Reward["AsteroidsObservation","AsteroidsAction"]):
     actions: List["AsteroidsAction"]
     
     def proximity_penalty(self) -> float:    
-        distances: NDArray[np.float32]|None = None
         penalty: List[float] = []
 
         for observation in self.observations:
-            if distances is None:
-                height,width,_ = self.observations[0].asteroids.shape
-                y_loc,x_loc = np.meshgrid(np.arange(width),np.arange(height))
-                center_y,center_x = height/2, width/2
-                distances = ((y_loc - center_y)**2 + (x_loc - center_x)**2)**(1/2)
-                distances = distances.max() - distances
-
-            centered_obs = observation.translated()
-            player = centered_obs.find_player()
+            player = observation.find_player()
             if player:
-                asteroids: NDArray[np.intp] = np.all(centered_obs.asteroids, axis=2)
-                asteroid_distances = distances[asteroids]
-                if asteroid_distances.size > 0:
-                    penalty.append(asteroid_distances.sum())
+                y,x = observation.asteroid_pixels()
+                if y.size > 0:
+                    height,width,_ = observation.asteroids.shape
+                    y,x = observation.translate_coordinates(y, x, new_center=player)
+                    penalty.append(_proximity_kernel(height, width)[y,x].sum())
 
         return sum(penalty)
     
     def salience_penalty(self, policy: "AsteroidsPolicy") -> float:
         penalties: List[float] = []
 
+        unimportant_features = policy.features() == 0
+        saliencies = policy.saliencies(self.actions)
+
         for action in self.actions:
-            features = policy.features()
-            salience = policy.saliency(action)
-            unimportant_features = np.argwhere(features == 0)
-            penalty = np.sum(salience[unimportant_features])
+            penalty = np.sum(saliencies[action][unimportant_features])
             penalties.append(penalty)
 
         return sum(penalties)
     
+
+@functools.lru_cache(maxsize=None)
+def _proximity_kernel(height: int, width: int) -> NDArray[np.float64]:
+    y_loc,x_loc = np.meshgrid(np.arange(width),np.arange(height))
+    center_y,center_x = height/2, width/2
+    distances: NDArray[np.float64] = ((y_loc - center_y)**2 + (x_loc - center_x)**2)**(1/2)
+    distances = distances.max() - distances
+    distances.setflags(write=False)
+    return distances
@@ -0,0 +1,67 @@
+from typing import *
+from numpy.typing import NDArray
+
+import numpy as np
+
+from ..vector_env import VectorEnvironment
+from .asteroids import Asteroids
+from .observation import AsteroidsObservation
+from .reward import AsteroidsReward
+from .action import AsteroidsAction
+
+class VectorAsteroids(VectorEnvironment[AsteroidsObservation,AsteroidsAction,AsteroidsReward]):
+
+    def __init__(self,
+                 size:              int,
+                 auto_reset:        bool = True,
+                 sticky_actions:    float = 0.0) -> None:
+        envs = tuple(Asteroids(sticky_actions=sticky_actions) for _ in range(size))
+        h,w,c = envs[0].observation_shape
+
+        # Every step of an Asteroids environment writes its screens into new arrays, since earlier observations
+        # stay referenced by their rewards. The layers are therefore only gathered when render or layers is called,
+        # into buffers that are reused by every call.
+        self._frames: NDArray[np.uint8] = np.zeros((size,h,w,c), dtype=np.uint8)
+        self._spaceships: NDArray[np.uint8] = np.zeros((size,h,w,c), dtype=np.uint8)
+        self._asteroids: NDArray[np.uint8] = np.zeros((size,h,w,c), dtype=np.uint8)
+        self._rewards: NDArray[np.float64] = np.zeros(size, dtype=np.float64)
+        self._angles: NDArray[np.float64] = np.zeros(size, dtype=np.float64)
+
+        super().__init__(envs=envs, auto_reset=auto_reset)
+
+        for slot in range(size):
+            self._on_step(slot)
+
+    def step(self,
+             actions:       Sequence[AsteroidsAction|None],
+             stochastic:    bool = False,
+             steps:         int|Sequence[int] = 1) -> Tuple[AsteroidsReward|None,...]:
+        rewards = super().step(actions=actions, stochastic=stochastic, steps=steps)
+        for slot,reward in enumerate(rewards):
+            self._rewards[slot] = 0 if reward is None else reward.native_game_reward()
+        return rewards
+
+    def native_rewards(self) -> NDArray[np.float64]:
+        return self._rewards
+
+    def render(self) -> NDArray[np.uint8]:
+        for slot in range(self.size()):
+            env = self[slot]
+            np.bitwise_or(env.spaceship, env.asteroids, out=self._frames[slot])
+        return self._frames
+
+    def layers(self) -> Tuple[NDArray[np.uint8],NDArray[np.uint8]]:
+        for slot in range(self.size()):
+            env = self[slot]
+            np.copyto(self._spaceships[slot], env.spaceship)
+            np.copyto(self._asteroids[slot], env.asteroids)
+        return self._spaceships, self._asteroids
+
+    def angles(self) -> NDArray[np.float64]:
+        return self._angles
+
+    def _on_step(self, slot: int) -> None:
+        self._angles[slot] = self[slot].get_angle()
+
+    def __getitem__(self, slot: int) -> Asteroids:
+        return cast(Asteroids, self._envs[slot])
@@ -31,4 +31,13 @@ class Observation(Generic[T], ABC):
             .type(literals.torch_dtype(dtype))\
             .to(device) / 255) \
             .requires_grad_(use_grad))
-    
\ No newline at end of file
+
+
+class Frame(Observation[T]):
+
+    def __init__(self, frame: NDArray[T]) -> None:
+        super().__init__()
+        self._frame = frame
+
+    def numpy(self) -> NDArray[T]:
+        return self._frame
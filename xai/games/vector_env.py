@@ -0,0 +1,83 @@
+from typing import *
+from numpy.typing import NDArray
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from numpy import generic
+    from . import Environment, Observation, Action, Reward
+
+O = TypeVar("O", bound="Observation[generic]")
+A = TypeVar("A", bound="Action")
+R = TypeVar("R", bound="Reward[Observation[generic],Action]")
+
+class VectorEnvironment(Generic[O,A,R]):
+
+    def __init__(self,
+                 envs:          Sequence["Environment[O,A,R]"],
+                 auto_reset:    bool = False) -> None:
+        super().__init__()
+        assert len(envs) > 0, "A vector environment must contain at least one environment."
+
+        self._envs = tuple(envs)
+        self.auto_reset = auto_reset
+        self.observation_shape = self._envs[0].observation_shape
+        self._dones = np.zeros(len(self._envs), dtype=np.bool_)
+
+    def size(self) -> int:
+        return len(self._envs)
+
+    def step(self,
+             actions:       Sequence[A|None],
+             stochastic:    bool = False,
+             steps:         int|Sequence[int] = 1) -> Tuple[R|None,...]:
+        assert len(actions) == self.size(), f"Expected {self.size()} actions, got {len(actions)}."
+
+        if isinstance(steps, int):
+            steps = (steps,)*self.size()
+
+        rewards: List[R|None] = []
+        for slot,(env,action,slot_steps) in enumerate(zip(self._envs, actions, steps, strict=True)):
+            if action is None:
+                rewards.append(None)
+                self._dones[slot] = False
+                continue
+
+            rewards.append(cast(R, cast(Any, env).step(action, stochastic=stochastic, steps=slot_steps)))
+            self._dones[slot] = not env.running()
+            if self._dones[slot] and self.auto_reset:
+                env.reset()
+
+            self._on_step(slot)
+
+        return tuple(rewards)
+
+    def observations(self) -> Tuple[O,...]:
+        return tuple(env.render() for env in self._envs)
+
+    def dones(self) -> NDArray[np.bool_]:
+        return self._dones
+
+    def running(self) -> NDArray[np.bool_]:
+        return np.array([env.running() for env in self._envs], dtype=np.bool_)
+
+    def lives(self) -> NDArray[np.int64]:
+        return np.array([cast(Any, env).lives() for env in self._envs], dtype=np.int64)
+
+    def reset(self) -> None:
+        for slot,env in enumerate(self._envs):
+            env.reset()
+            self._on_step(slot)
+        self._dones[:] = False
+
+    def _on_step(self, slot: int) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return self.size()
+
+    def __getitem__(self, slot: int) -> "Environment[O,A,R]":
+        return self._envs[slot]
+
+    def __iter__(self) -> Iterator["Environment[O,A,R]"]:
+        return iter(self._envs)
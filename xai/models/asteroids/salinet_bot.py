@@ -1,7 +1,9 @@
 from typing import *
 
 from . import AsteroidsGenome
-from ...agents import Fitness
+from ...agents import Fitness, FitnessSchema
+
+import numpy as np
 
 if TYPE_CHECKING:
     from . import (AsteroidsObservation, 
@@ -10,6 +12,8 @@ if TYPE_CHECKING:
                    AsteroidsReward
                    )
 
+_FITNESS_SCHEMA = FitnessSchema.of(rewards=("clearance","salience"), penalties=())
+
 class SalientBot(AsteroidsGenome):
 
     def fitness(self, 
@@ -18,7 +22,9 @@ class SalientBot(AsteroidsGenome):
                 policy:         "AsteroidsPolicy", 
                 action:         "AsteroidsAction", 
                 reward:         "AsteroidsReward") -> Fitness:
-        return Fitness(rewards={
-            "clearance": reward.proximity_penalty(),
-            "salience": reward.salience_penalty(policy=policy)
-            })
\ No newline at end of file
+        return Fitness(
+            schema=_FITNESS_SCHEMA,
+            values=np.array([
+                reward.proximity_penalty(),
+                self.salience_penalty(game_step, policy, reward)
+            ], dtype=np.float64))
\ No newline at end of file
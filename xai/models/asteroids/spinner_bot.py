@@ -1,7 +1,9 @@
 from typing import *
 
 from . import AsteroidsGenome
-from ...agents import Fitness
+from ...agents import Fitness, FitnessSchema
+
+import numpy as np
 
 if TYPE_CHECKING:
     from . import (AsteroidsObservation, 
@@ -10,6 +12,8 @@ if TYPE_CHECKING:
                    AsteroidsReward
                    )
 
+_FITNESS_SCHEMA = FitnessSchema.of(rewards=("game_score",), penalties=())
+
 class SpinnerBot(AsteroidsGenome):
 
     def fitness(self, 
@@ -18,6 +22,8 @@ class SpinnerBot(AsteroidsGenome):
                 policy:         "AsteroidsPolicy", 
                 action:         "AsteroidsAction", 
                 reward:         "AsteroidsReward") -> Fitness:
-        return Fitness(rewards={
-            "game_score": reward.native_game_reward()
-            })
\ No newline at end of file
+        return Fitness(
+            schema=_FITNESS_SCHEMA,
+            values=np.array([
+                reward.native_game_reward()
+            ], dtype=np.float64))
\ No newline at end of file
@@ -3,7 +3,9 @@ from typing import *
 from xai.util import Device
 
 from . import AsteroidsGenome
-from ...agents import Fitness
+from ...agents import Fitness, FitnessSchema
+
+import numpy as np
 
 if TYPE_CHECKING:
     from . import (AsteroidsObservation, 
@@ -11,6 +13,8 @@ if TYPE_CHECKING:
                    AsteroidsAction, 
                    AsteroidsReward)
 
+_FITNESS_SCHEMA = FitnessSchema.of(rewards=("game_score",), penalties=("salience","proximity","game_step"))
+
 class V5Bot(AsteroidsGenome):
 
     def fitness(self, 
@@ -20,11 +24,10 @@ class V5Bot(AsteroidsGenome):
                 action:         "AsteroidsAction", 
                 reward:         "AsteroidsReward") -> Fitness:
         return Fitness(
-            rewards={
-                "game_score": reward.native_game_reward()
-            }, 
-            penalties={
-                "salience": reward.salience_penalty(policy=policy),
-                "proximity": reward.proximity_penalty(),
-                "game_step": 1
-            })
\ No newline at end of file
+            schema=_FITNESS_SCHEMA,
+            values=np.array([
+                reward.native_game_reward(),
+                self.salience_penalty(game_step, policy, reward),
+                reward.proximity_penalty(),
+                len(reward.values)
+            ], dtype=np.float64))
\ No newline at end of file
@@ -3,7 +3,9 @@ from typing import *
 from torch import FloatTensor
 
 from . import AsteroidsGenome
-from ...agents import Fitness
+from ...agents import Fitness, FitnessSchema
+
+import numpy as np
 
 if TYPE_CHECKING:
     from . import (AsteroidsObservation, 
@@ -11,10 +13,12 @@ if TYPE_CHECKING:
                    AsteroidsAction, 
                    AsteroidsReward)
 
+_FITNESS_SCHEMA = FitnessSchema.of(rewards=("game_score",), penalties=("salience","proximity","game_step"))
+
 class V6Bot(AsteroidsGenome):
 
     def in_transform(self, observation: "AsteroidsObservation") -> FloatTensor:
-        return observation.translated().rotated().tensor(
+        return observation.ego_centric().preprocessed(self.preprocessing).tensor(
             device=self.device,
             dtype="float32",
             flatten=True,
@@ -28,11 +32,10 @@ class V6Bot(AsteroidsGenome):
                 action:         "AsteroidsAction", 
                 reward:         "AsteroidsReward") -> Fitness:
         return Fitness(
-            rewards={
-                "game_score": reward.native_game_reward()
-            }, 
-            penalties={
-                "salience": reward.salience_penalty(policy=policy),
-                "proximity": reward.proximity_penalty(),
-                "game_step": 1
-            })
\ No newline at end of file
+            schema=_FITNESS_SCHEMA,
+            values=np.array([
+                reward.native_game_reward(),
+                self.salience_penalty(game_step, policy, reward),
+                reward.proximity_penalty(),
+                len(reward.values)
+            ], dtype=np.float64))
\ No newline at end of file
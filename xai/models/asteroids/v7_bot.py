@@ -5,8 +5,9 @@ from xai.agents.ga.chromosome import Chromosome
 from xai.agents.memory import Memory
 
 from . import AsteroidsGenome
-from ...agents import Fitness
+from ...agents import Fitness, FitnessSchema
 
+import numpy as np
 import torch
 
 if TYPE_CHECKING:
@@ -16,10 +17,12 @@ if TYPE_CHECKING:
                    AsteroidsAction, 
                    AsteroidsReward)
 
+_FITNESS_SCHEMA = FitnessSchema.of(rewards=("game_score",), penalties=("salience","proximity","game_step"))
+
 class V7Bot(AsteroidsGenome):
 
     def in_transform(self, observation: "AsteroidsObservation") -> FloatTensor:
-        return observation.translated().rotated().tensor(
+        return observation.ego_centric().preprocessed(self.preprocessing).tensor(
             device=self.device,
             dtype="float32",
             flatten=True,
@@ -33,19 +36,18 @@ class V7Bot(AsteroidsGenome):
                 action:         "AsteroidsAction", 
                 reward:         "AsteroidsReward") -> Fitness:
         return Fitness(
-            rewards={
-                "game_score": reward.native_game_reward()
-            }, 
-            penalties={
-                "salience": reward.salience_penalty(policy=policy),
-                "proximity": reward.proximity_penalty(),
-                "game_step": 1
-            })
+            schema=_FITNESS_SCHEMA,
+            values=np.array([
+                reward.native_game_reward(),
+                self.salience_penalty(game_step, policy, reward),
+                reward.proximity_penalty(),
+                len(reward.values)
+            ], dtype=np.float64))
     
     def create_layers(self, device: "Device") -> Iterable[Callable[[FloatTensor], FloatTensor]]:
-        input_size = 210*160*3
+        input_size = self.input_size()
         return (
-            Chromosome(input_size,64, mutation_rate=self.mutation_rate, device=device, dtype="float32"),
+            Chromosome(input_size,64, mutation_rate=self.mutation_rate, device=device, dtype="float32", sparse_input=self.sparse_input),
             torch.nn.Tanh(),
             Memory(),
             torch.nn.Tanh(),
@@ -1,5 +1,5 @@
 from .bytesize import ByteSize
-from .cache import Cache, Load, Dump
+from .cache import Cache, Load, Dump, Mapped
 from .literals import Device, DataType
 from .maybe import Maybe, Option, Try, Some, Nil, Error
 from . import bytesize, maybe, cache, literals
\ No newline at end of file
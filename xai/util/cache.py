@@ -1,9 +1,12 @@
 from typing import *
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
+from numpy.typing import NDArray
 
+import numpy as np
 import pickle
 import tempfile
+import os
 
 T = TypeVar("T")
 
@@ -83,3 +86,121 @@ class Load(Cache[T]):
 
     def __exit__(self, *_: Any) -> None:
         pass
+
+
+class Flat(Protocol):
+    # Data whose state is mostly a flat float32 buffer of weights, such as a genome.
+
+    def numel(self) -> int:
+        ...
+
+    def flatten(self, out: NDArray[np.float32]|None = None) -> NDArray[np.float32]:
+        ...
+
+    def bind(self, buffer: NDArray[np.float32], copy: bool = True) -> None:
+        ...
+
+    def view(self, buffer: NDArray[np.float32]) -> Self:
+        ...
+
+    def is_view(self, buffer: NDArray[np.float32]) -> bool:
+        ...
+
+class Mapped(Cache[T]):
+
+    def __init__(self, data: T) -> None:
+        super().__init__()
+        # The weights live in a row of a memory mapped slab and everything else in a skeleton whose weights
+        # are views of that row. Entering is zero-copy, in-place modifications go straight to the slab, and
+        # only weights that were replaced while entered are written back on exit.
+        flat = cast(Flat, data)
+        self._slot = _allocator(flat.numel()).allocate()
+        self._enters = 0
+        self._data = cast(T, flat.view(flat.flatten(out=self._slot.row())))
+
+    def dumped(self) -> Dump[T]:
+        with self as data:
+            return Dump(data=data)
+
+    def loaded(self) -> Load[T]:
+        with self as data:
+            return Load(data=data)
+
+    def __enter__(self) -> T:
+        assert self._enters >= 0
+        self._enters += 1
+        return self._data
+
+    def __exit__(self, *_: Any) -> None:
+        assert self._enters > 0
+        self._enters -= 1
+        flat = cast(Flat, self._data)
+        if self._enters < 1 and not flat.is_view(self._slot.row()):
+            flat.bind(self._slot.row(), copy=True)
+
+    def __reduce__(self) -> Tuple[Any,...]:
+        # Pickled and copied like the data itself, and mapped to a new row when restored.
+        return Mapped, (self._data,)
+
+    def __del__(self) -> None:
+        slot = getattr(self, "_slot", None)
+        if slot is not None:
+            slot.free()
+
+
+_SLAB_ROWS = 64
+
+class _Slab:
+
+    def __init__(self, numel: int) -> None:
+        super().__init__()
+        self._file = tempfile.TemporaryFile(mode="w+b")
+        self._file.truncate(_SLAB_ROWS*numel*np.dtype(np.float32).itemsize)
+        self.rows: NDArray[np.float32] = np.memmap(self._file, dtype=np.float32, mode="r+", shape=(_SLAB_ROWS, numel))
+
+    def __del__(self) -> None:
+        self._file.close()
+
+class _Slot:
+
+    def __init__(self, allocator: "_Allocator", slab: _Slab, index: int) -> None:
+        super().__init__()
+        self._allocator = allocator
+        self._slab = slab
+        self._index = index
+
+    def row(self) -> NDArray[np.float32]:
+        return self._slab.rows[self._index]
+
+    def free(self) -> None:
+        self._allocator.free(self._slab, self._index)
+
+class _Allocator:
+
+    def __init__(self, numel: int) -> None:
+        super().__init__()
+        self._numel = numel
+        self._free: List[Tuple[_Slab,int]] = []
+
+    def allocate(self) -> _Slot:
+        if not self._free:
+            slab = _Slab(self._numel)
+            self._free.extend((slab, index) for index in reversed(range(_SLAB_ROWS)))
+        return _Slot(self, *self._free.pop())
+
+    def free(self, slab: _Slab, index: int) -> None:
+        self._free.append((slab, index))
+
+_allocators: Dict[int,_Allocator] = {}
+_allocators_pid = os.getpid()
+
+def _allocator(numel: int) -> _Allocator:
+    # A forked process shares the slabs of its parent, so it must not hand out their free rows.
+    global _allocators_pid
+    if _allocators_pid != os.getpid():
+        _allocators.clear()
+        _allocators_pid = os.getpid()
+
+    if numel not in _allocators:
+        _allocators[numel] = _Allocator(numel)
+    return _allocators[numel]